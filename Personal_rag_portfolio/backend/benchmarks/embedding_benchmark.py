@@ -0,0 +1,133 @@
+"""
+backend/benchmarks/embedding_benchmark.py - PyTorch vs ONNX (int8) MiniLM
+
+Compares encoding throughput and retrieval agreement of the two embedding
+backends. Recall@k is measured against the PyTorch backend as ground
+truth: for each query, how many of its top-k chunks the ONNX backend also
+ranks in its top-k. Usage (from backend/):
+
+    python benchmarks/embedding_benchmark.py --pdf Lukman_Ibrahim_Knowledge_Base.pdf
+    python benchmarks/embedding_benchmark.py --threads 4 --output embed.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+QUERIES = [
+    "What is Lukman's email address?",
+    "Which company does Lukman work for?",
+    "What projects has Lukman built?",
+    "What programming languages does he use?",
+    "Tell me about his design portfolio",
+    "What is his experience with AI development?",
+    "How can I contact him on LinkedIn?",
+    "What frameworks has he worked with?",
+]
+
+WORDS = (
+    "lukman builds ai systems with python fastapi react langchain chroma retrieval "
+    "design portfolio behance figma ncc nigeria communications commission developer "
+    "projects experience education skills machine learning embeddings vectors agents"
+).split()
+
+
+def load_corpus(pdf_path, size):
+    if pdf_path:
+        from langchain_community.document_loaders import PyPDFLoader
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+        chunks = splitter.split_documents(PyPDFLoader(pdf_path).load())
+        texts = [chunk.page_content for chunk in chunks]
+        while len(texts) < size:
+            texts.extend(texts[:size - len(texts)])
+        return texts[:size]
+    rng = random.Random(42)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(80, 160))) for _ in range(size)]
+
+
+def time_encode(embeddings, texts, repeats):
+    embeddings.embed_documents(texts[:8])  # warm-up
+    best = float("inf")
+    vectors = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        vectors = embeddings.embed_documents(texts)
+        best = min(best, time.perf_counter() - start)
+    query_start = time.perf_counter()
+    for query in QUERIES:
+        embeddings.embed_query(query)
+    query_ms = (time.perf_counter() - query_start) * 1000 / len(QUERIES)
+    return np.asarray(vectors, dtype=np.float32), best, query_ms
+
+
+def top_k(doc_vectors, query_vectors, k):
+    scores = query_vectors @ doc_vectors.T
+    return [set(np.argpartition(-row, k)[:k]) for row in scores]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MiniLM embedding backends")
+    parser.add_argument("--pdf", help="Use chunks from this PDF (default: synthetic text)")
+    parser.add_argument("--size", type=int, default=512, help="Number of chunks to encode")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None, help="ONNX intra-op threads")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--no-quantize", action="store_true")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    from onnx_embeddings import OnnxMiniLMEmbeddings
+
+    texts = load_corpus(args.pdf, args.size)
+    backends = {
+        "torch": HuggingFaceEmbeddings(
+            model_name="all-MiniLM-L6-v2",
+            model_kwargs={'device': 'cpu'},
+            encode_kwargs={'normalize_embeddings': True}
+        ),
+        "onnx": OnnxMiniLMEmbeddings(num_threads=args.threads, quantize=not args.no_quantize),
+    }
+
+    results = {"chunks": len(texts), "k": args.k, "backends": {}}
+    vectors = {}
+    for name, embeddings in backends.items():
+        doc_vectors, seconds, query_ms = time_encode(embeddings, texts, args.repeats)
+        query_vectors = np.asarray([embeddings.embed_query(q) for q in QUERIES], dtype=np.float32)
+        vectors[name] = (doc_vectors, query_vectors)
+        results["backends"][name] = {
+            "encode_seconds": round(seconds, 3),
+            "chunks_per_second": round(len(texts) / seconds, 1),
+            "query_latency_ms": round(query_ms, 2),
+            "mean_norm": round(float(np.linalg.norm(doc_vectors, axis=1).mean()), 4),
+        }
+
+    reference = top_k(*vectors["torch"], args.k)
+    candidate = top_k(*vectors["onnx"], args.k)
+    recall = np.mean([len(ref & cand) / args.k for ref, cand in zip(reference, candidate)])
+    cosine = np.sum(vectors["torch"][0] * vectors["onnx"][0], axis=1)
+
+    results["recall_at_k_vs_torch"] = round(float(recall), 4)
+    results["mean_cosine_vs_torch"] = round(float(cosine.mean()), 4)
+    results["speedup"] = round(
+        results["backends"]["onnx"]["chunks_per_second"]
+        / results["backends"]["torch"]["chunks_per_second"], 2
+    )
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+backend/benchmarks/fakes.py - Offline stand-ins for benchmarking LukmanRAGSystem
+
+FakeChatModel replaces Gemini (deterministic answers, configurable
+latency), HashingEmbeddings replaces MiniLM when the model isn't cached
+locally, and write_synthetic_pdf generates a corpus with known facts.
+"""
+import math
+import time
+import random
+import hashlib
+from typing import Iterator, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic chat model: sleeps `latency_seconds`, then answers.
+
+    The answer depends only on the prompt, so runs are comparable.
+    Streaming emits one word per chunk, paced by `tokens_per_second`
+    (0 = as fast as possible).
+    """
+
+    model_name: str = "fake-chat"
+    latency_seconds: float = 0.05
+    tokens_per_second: float = 0.0
+    answer_words: int = 40
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _answer(self, messages) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        words = [word for word in prompt.split() if word.isalpha()]
+        rng = random.Random(digest)
+        picked = [rng.choice(words) for _ in range(self.answer_words)] if words else []
+        return f"[{digest[:8]}] " + " ".join(picked)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_seconds)
+        message = AIMessage(content=self._answer(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None,
+                **kwargs) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency_seconds)  # time to first token
+        delay = 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+        for word in self._answer(messages).split(" "):
+            if delay:
+                time.sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+class HashingEmbeddings(Embeddings):
+    """Feature-hashed bag of words, L2-normalized (same dimension as MiniLM).
+
+    Lexically similar texts get similar vectors, which is enough to
+    exercise Chroma and the caches without downloading a model.
+    """
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimension
+        for word in text.lower().split():
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimension
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+# Vocabulary for the synthetic knowledge base
+PROJECTS = ["Atlas", "Beacon", "Cobalt", "Delta", "Ember", "Falcon", "Granite", "Harbor",
+            "Iris", "Juniper", "Kestrel", "Lumen", "Meridian", "Nimbus", "Orchid", "Pioneer"]
+TOOLS = ["Python", "FastAPI", "React", "LangChain", "Chroma", "Docker", "PostgreSQL",
+         "TypeScript", "Figma", "Redis", "Kubernetes", "TensorFlow"]
+DOMAINS = ["healthcare", "fintech", "logistics", "education", "telecoms", "agriculture",
+           "retail", "energy"]
+FILLER = ("the team iterated on the design with stakeholders and shipped features in short "
+          "cycles while keeping documentation tests and deployment pipelines up to date").split()
+
+
+def _fact(rng: random.Random, index: int) -> Tuple[str, str]:
+    """One sentence plus a question it answers"""
+    project = f"{rng.choice(PROJECTS)}-{index}"
+    tool = rng.choice(TOOLS)
+    domain = rng.choice(DOMAINS)
+    year = rng.randint(2016, 2025)
+    sentence = (f"Project {project} was a {domain} platform built with {tool} in {year}. "
+                + " ".join(rng.choices(FILLER, k=rng.randint(20, 40))) + ".")
+    return sentence, f"Which tools were used for project {project}?"
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str, width: int) -> List[str]:
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def write_synthetic_pdf(path: str, pages: int = 20, seed: int = 42,
+                        lines_per_page: int = 55) -> List[str]:
+    """Write a text PDF of made-up project facts; returns questions about them.
+
+    Plain PDF 1.4 with the built-in Helvetica font, so no PDF library is
+    needed to generate it and PyPDFLoader extracts the text as usual.
+    """
+    rng = random.Random(seed)
+    page_streams, questions = [], []
+    fact_index = 0
+    for _ in range(pages):
+        lines: List[str] = []
+        while len(lines) < lines_per_page:
+            sentence, question = _fact(rng, fact_index)
+            fact_index += 1
+            questions.append(question)
+            lines.extend(_wrap(sentence, 95) + [""])
+        body = " T* ".join(f"({_pdf_escape(line)}) Tj" for line in lines[:lines_per_page])
+        page_streams.append(f"BT /F1 10 Tf 12 TL 50 750 Td {body} ET".encode("latin-1"))
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then (page, contents) pairs
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for i, stream in enumerate(page_streams):
+        page_id, content_id = 4 + 2 * i, 5 + 2 * i
+        kids.append(f"{page_id} 0 R")
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1")
+        objects[content_id] = (
+            f"<< /Length {len(stream)} >>\nstream\n".encode("latin-1") + stream + b"\nendstream"
+        )
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode("latin-1")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(output)
+        output += f"{object_id} 0 obj\n".encode("latin-1") + objects[object_id] + b"\nendobj\n"
+    xref_offset = len(output)
+    size = max(objects) + 1
+    output += f"xref\n0 {size}\n0000000000 65535 f \n".encode("latin-1")
+    for object_id in range(1, size):
+        output += f"{offsets[object_id]:010d} 00000 n \n".encode("latin-1")
+    output += (f"trailer\n<< /Size {size} /Root 1 0 R >>\n"
+               f"startxref\n{xref_offset}\n%%EOF\n").encode("latin-1")
+
+    with open(path, "wb") as f:
+        f.write(output)
+    return questions
+
+
+def sample_questions(questions: List[str], count: int, seed: int = 7,
+                     extra: Optional[List[str]] = None) -> List[str]:
+    """Deterministic sample of `count` questions (with repeats if needed)"""
+    rng = random.Random(seed)
+    pool = list(questions) + list(extra or [])
+    return [rng.choice(pool) for _ in range(count)]
@@ -0,0 +1,194 @@
+"""
+backend/benchmarks/rag_benchmark.py - End-to-end RAG benchmark, fully offline
+
+Runs LukmanRAGSystem against a generated PDF with a fake LLM (no
+GOOGLE_API_KEY needed) in a throwaway vector store, and measures:
+
+  - ingestion throughput (pages/s, chunks/s)
+  - retrieval latency (search) p50/p95/p99
+  - end-to-end get_response latency p50/p95/p99
+  - /api/chat requests per second at several concurrency levels
+
+Usage (from backend/):
+
+    python benchmarks/rag_benchmark.py --output rag.json
+    python benchmarks/rag_benchmark.py --embeddings hashing --llm-latency-ms 200
+    python benchmarks/rag_benchmark.py --concurrency 1 8 32 --requests 200
+
+--embeddings hashing avoids loading MiniLM altogether (timings then
+exclude model cost). The answer cache and the query-embedding cache are
+off unless --answer-cache / --query-embedding-cache are given: questions
+repeat across phases, so cached runs would mostly time cache hits.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fakes import FakeChatModel, HashingEmbeddings, write_synthetic_pdf, sample_questions
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, round(pct / 100.0 * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+
+def summarize_ms(samples):
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) * 1000 / len(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def time_calls(func, inputs):
+    samples = []
+    for item in inputs:
+        start = time.perf_counter()
+        func(item)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_ingestion(rag, pdf_path):
+    start = time.perf_counter()
+    chunks = rag.process_pdf(pdf_path)
+    seconds = time.perf_counter() - start
+    stats = dict(rag.last_ingest_stats)
+    return {
+        "seconds": round(seconds, 3),
+        "chunks": chunks,
+        "pages": stats.get("pages_loaded"),
+        "chunks_per_second": round(chunks / seconds, 1) if seconds else None,
+        "pages_per_second": round(stats.get("pages_loaded", 0) / seconds, 1) if seconds else None,
+        "pipeline": stats,
+    }
+
+
+async def bench_http(app, questions, concurrency):
+    """Fire len(questions) POST /api/chat requests with `concurrency` in flight"""
+    import httpx
+
+    latencies, errors = [], 0
+    pending = iter(questions)
+
+    async def worker(client):
+        nonlocal errors
+        for question in pending:
+            start = time.perf_counter()
+            response = await client.post("/api/chat", json={"message": question})
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark",
+                                 timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        seconds = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(latencies) / seconds, 2) if seconds else None,
+        "latency": summarize_ms(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end RAG benchmark")
+    parser.add_argument("--pages", type=int, default=20, help="Synthetic PDF size")
+    parser.add_argument("--pdf", help="Benchmark this PDF instead of a synthetic one")
+    parser.add_argument("--embeddings", choices=["minilm", "hashing"], default="minilm")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--queries", type=int, default=200, help="search()/get_response() calls")
+    parser.add_argument("--requests", type=int, default=100, help="HTTP requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--retrieval-mode", choices=["similarity", "hybrid"], default=None)
+    parser.add_argument("--answer-cache", action="store_true", help="Keep the semantic answer cache on")
+    parser.add_argument("--query-embedding-cache", action="store_true",
+                        help="Keep the query-embedding LRU on (repeated questions skip encoding)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    # Read by rag_system at import time
+    os.environ["RAG_ANSWER_CACHE"] = "1" if args.answer_cache else "0"
+    if not args.query_embedding_cache:
+        os.environ["RAG_QUERY_EMBEDDING_CACHE_SIZE"] = "0"
+        os.environ["RAG_QUERY_EMBEDDING_CACHE_PATH"] = ""
+    persist_directory = tempfile.mkdtemp(prefix="rag_benchmark_")
+
+    import main as api
+    from rag_system import LukmanRAGSystem
+
+    try:
+        pdf_path = args.pdf
+        questions = []
+        if not pdf_path:
+            pdf_path = os.path.join(persist_directory, "synthetic_knowledge_base.pdf")
+            questions = write_synthetic_pdf(pdf_path, pages=args.pages, seed=args.seed)
+        questions = sample_questions(questions, args.queries, seed=args.seed, extra=[
+            "What is Lukman's email address?",
+            "What projects has Lukman built?",
+        ])
+
+        rag = LukmanRAGSystem(
+            llm=FakeChatModel(latency_seconds=args.llm_latency_ms / 1000.0),
+            embeddings=HashingEmbeddings() if args.embeddings == "hashing" else None,
+            persist_directory=persist_directory,
+            retrieval_mode=args.retrieval_mode
+        )
+
+        results = {
+            "config": {
+                "pdf": args.pdf or f"synthetic ({args.pages} pages)",
+                "embeddings": args.embeddings,
+                "llm_latency_ms": args.llm_latency_ms,
+                "retrieval_mode": rag.retrieval_mode,
+                "answer_cache": args.answer_cache,
+                "query_embedding_cache": args.query_embedding_cache,
+                "rag_workers": api.RAG_WORKERS,
+            },
+            "ingestion": bench_ingestion(rag, pdf_path),
+        }
+
+        rag.search(questions[0])  # warm-up: model load, Chroma client
+        results["retrieval"] = summarize_ms(time_calls(rag.search, questions))
+        results["get_response"] = summarize_ms(time_calls(rag.get_response, questions))
+
+        api.rag_system = rag
+        results["http_chat"] = [
+            asyncio.run(bench_http(api.app, questions[:args.requests], concurrency))
+            for concurrency in args.concurrency
+        ]
+        results["system_status"] = rag.get_system_status()
+    finally:
+        api.rag_executor.shutdown(wait=False)
+        shutil.rmtree(persist_directory, ignore_errors=True)
+
+    output = json.dumps(results, indent=2, default=str)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
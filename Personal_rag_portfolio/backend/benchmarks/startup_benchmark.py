@@ -0,0 +1,117 @@
+"""
+backend/benchmarks/startup_benchmark.py - Import and startup time benchmark
+
+Each measurement runs in a fresh interpreter so module caches don't hide
+import cost. Usage (from backend/):
+
+    python benchmarks/startup_benchmark.py --runs 5 --max-import-seconds 1.0
+    python benchmarks/startup_benchmark.py --pdf Lukman_Ibrahim_Knowledge_Base.pdf
+
+--pdf additionally measures time to first answer (needs GOOGLE_API_KEY).
+Exits with status 1 when an import/startup budget is exceeded.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Snippets timed in a child interpreter; each prints elapsed seconds
+IMPORT_RAG_SYSTEM = """
+import time
+start = time.perf_counter()
+import rag_system
+print(time.perf_counter() - start)
+"""
+
+IMPORT_MAIN = """
+import time
+start = time.perf_counter()
+import main
+print(time.perf_counter() - start)
+"""
+
+CONSTRUCT_SYSTEM = """
+import os, time
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+start = time.perf_counter()
+from rag_system import LukmanRAGSystem
+LukmanRAGSystem()
+print(time.perf_counter() - start)
+"""
+
+FIRST_ANSWER = """
+import time
+start = time.perf_counter()
+from rag_system import LukmanRAGSystem
+rag = LukmanRAGSystem()
+rag.process_pdf({pdf!r})
+rag.get_response("What is Lukman's email address?")
+print(time.perf_counter() - start)
+"""
+
+
+def time_snippet(code: str, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        # The timing is the last line; everything before is status output
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return {
+        "runs": runs,
+        "median_seconds": round(statistics.median(samples), 4),
+        "min_seconds": round(min(samples), 4),
+        "max_seconds": round(max(samples), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure rag_system import/startup time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--pdf", help="Also measure time to first answer for this PDF")
+    parser.add_argument("--max-import-seconds", type=float, default=None,
+                        help="Fail if median import of rag_system exceeds this")
+    parser.add_argument("--max-startup-seconds", type=float, default=None,
+                        help="Fail if median LukmanRAGSystem() construction exceeds this")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    results = {
+        "import_rag_system": time_snippet(IMPORT_RAG_SYSTEM, args.runs),
+        "import_main": time_snippet(IMPORT_MAIN, args.runs),
+        "construct_rag_system": time_snippet(CONSTRUCT_SYSTEM, args.runs),
+    }
+    if args.pdf:
+        results["time_to_first_answer"] = time_snippet(
+            FIRST_ANSWER.format(pdf=os.path.abspath(args.pdf)), 1
+        )
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+    failures = []
+    if args.max_import_seconds is not None and \
+            results["import_rag_system"]["median_seconds"] > args.max_import_seconds:
+        failures.append(f"import_rag_system > {args.max_import_seconds}s")
+    if args.max_startup_seconds is not None and \
+            results["construct_rag_system"]["median_seconds"] > args.max_startup_seconds:
+        failures.append(f"construct_rag_system > {args.max_startup_seconds}s")
+    if failures:
+        print("❌ Startup budget exceeded: " + ", ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+backend/benchmarks/vector_index_benchmark.py - Chroma vs compact (int8/float16) index
+
+Builds the same set of normalized vectors into a persistent Chroma
+collection and into CompactVectorIndex files, then compares query
+latency, recall@k against exact float32 search, and memory/disk use.
+Vectors are synthetic and clustered like sentence embeddings of one
+document collection. Usage (from backend/):
+
+    python benchmarks/vector_index_benchmark.py --size 5000
+    python benchmarks/vector_index_benchmark.py --size 20000 --queries 500 --output vec.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from compact_index import CompactVectorIndex
+
+
+def synthetic_vectors(size, dim, clusters, seed):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, size)] + 0.6 * rng.normal(size=(size, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def perturbed_queries(vectors, count, seed):
+    rng = np.random.default_rng(seed + 1)
+    queries = vectors[rng.integers(0, len(vectors), count)] + 0.3 * rng.normal(size=(count, vectors.shape[1]))
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return queries.astype(np.float32)
+
+
+def max_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def dir_size_mb(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / (1024 * 1024)
+
+
+def latency_summary(samples):
+    ordered = sorted(samples)
+    pick = lambda pct: ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))]
+    return {
+        "p50_ms": round(pick(50) * 1000, 4),
+        "p95_ms": round(pick(95) * 1000, 4),
+        "p99_ms": round(pick(99) * 1000, 4),
+        "mean_ms": round(sum(ordered) * 1000 / len(ordered), 4),
+    }
+
+
+def recall(exact_top, found_top, k):
+    return round(float(np.mean([len(set(a) & set(b)) / k for a, b in zip(exact_top, found_top)])), 4)
+
+
+def bench_chroma(vectors, ids, queries, k, workdir):
+    import chromadb
+
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    client = chromadb.PersistentClient(path=os.path.join(workdir, "chroma"))
+    collection = client.get_or_create_collection(name="benchmark", embedding_function=None)
+    for offset in range(0, len(ids), 1000):
+        collection.add(
+            ids=ids[offset:offset + 1000],
+            embeddings=vectors[offset:offset + 1000].tolist(),
+            documents=[f"chunk {i}" for i in range(offset, min(offset + 1000, len(ids)))]
+        )
+    build_seconds = time.perf_counter() - start
+
+    samples, found = [], []
+    for query in queries:
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k,
+                                  include=["documents", "metadatas", "distances"])
+        samples.append(time.perf_counter() - start)
+        found.append([int(chunk_id) for chunk_id in result["ids"][0]])
+
+    start = time.perf_counter()
+    collection.query(query_embeddings=queries.tolist(), n_results=k)
+    batch_seconds = time.perf_counter() - start
+
+    return found, {
+        "build_seconds": round(build_seconds, 3),
+        "single_query": latency_summary(samples),
+        "batch_queries_per_second": round(len(queries) / batch_seconds, 1),
+        "disk_mb": round(dir_size_mb(os.path.join(workdir, "chroma")), 2),
+        "max_rss_growth_mb": round(max_rss_mb() - rss_before, 2),
+    }
+
+
+def bench_compact(vectors, ids, queries, k, workdir, dtype):
+    prefix = os.path.join(workdir, f"compact_{dtype}")
+    start = time.perf_counter()
+    CompactVectorIndex.build(ids, vectors, [f"chunk {i}" for i in range(len(ids))],
+                             [{} for _ in ids], dtype).save(prefix)
+    build_seconds = time.perf_counter() - start
+
+    index = CompactVectorIndex.load(prefix)
+    samples, found = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = index.search_batch([query], k)[0]  # includes Document construction, like Chroma
+        samples.append(time.perf_counter() - start)
+        found.append([int(doc.page_content.split()[-1]) for doc, _ in hits])
+
+    start = time.perf_counter()
+    index.search_batch(queries, k)
+    batch_seconds = time.perf_counter() - start
+
+    return found, {
+        "build_seconds": round(build_seconds, 3),
+        "single_query": latency_summary(samples),
+        "batch_queries_per_second": round(len(queries) / batch_seconds, 1),
+        "matrix_mb": round(index.nbytes / (1024 * 1024), 3),
+        "disk_mb": round((os.path.getsize(prefix + ".npy") + os.path.getsize(prefix + ".json"))
+                         / (1024 * 1024), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Chroma vs the compact vector index")
+    parser.add_argument("--size", type=int, default=5000, help="Number of stored vectors")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-chroma", action="store_true")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.size, args.dim, args.clusters, args.seed)
+    queries = perturbed_queries(vectors, args.queries, args.seed)
+    ids = [str(i) for i in range(args.size)]
+    exact_scores = queries @ vectors.T
+    exact_top = np.argsort(-exact_scores, axis=1)[:, :args.k]
+
+    results = {
+        "vectors": args.size,
+        "dim": args.dim,
+        "queries": args.queries,
+        "k": args.k,
+        "float32_matrix_mb": round(vectors.nbytes / (1024 * 1024), 3),
+        "backends": {},
+    }
+    workdir = tempfile.mkdtemp(prefix="vector_index_benchmark_")
+    try:
+        for dtype in ("int8", "float16"):
+            found, stats = bench_compact(vectors, ids, queries, args.k, workdir, dtype)
+            stats["recall_at_k"] = recall(exact_top, found, args.k)
+            results["backends"][f"compact_{dtype}"] = stats
+        if not args.skip_chroma:
+            found, stats = bench_chroma(vectors, ids, queries, args.k, workdir)
+            stats["recall_at_k"] = recall(exact_top, found, args.k)
+            results["backends"]["chroma"] = stats
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
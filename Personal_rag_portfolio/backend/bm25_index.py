@@ -0,0 +1,141 @@
+"""
+backend/bm25_index.py - In-process BM25 inverted index for exact-term lookups
+"""
+import os
+import re
+import json
+import math
+import heapq
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[@._+\-/][a-z0-9]+)*")
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms; emails/URLs/versions are kept whole AND split into parts"""
+    tokens = []
+    for match in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(match)
+        if not match.isalnum():
+            tokens.extend(WORD_PATTERN.findall(match))
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over chunk IDs, updated incrementally as chunks come and go.
+
+    Scoring only touches the posting lists of the query's terms, so a
+    lookup costs microseconds for a personal-sized corpus.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._documents: Dict[str, dict] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, ids: Iterable[str], texts: Iterable[str], metadatas: Iterable[dict]):
+        with self._lock:
+            for chunk_id, text, metadata in zip(ids, texts, metadatas):
+                if chunk_id in self._documents:
+                    self._remove_one(chunk_id)
+                term_counts = Counter(tokenize(text))
+                for term, count in term_counts.items():
+                    self._postings.setdefault(term, {})[chunk_id] = count
+                length = sum(term_counts.values())
+                self._doc_lengths[chunk_id] = length
+                self._total_length += length
+                self._documents[chunk_id] = {"text": text, "metadata": dict(metadata)}
+
+    def remove(self, ids: Iterable[str]):
+        with self._lock:
+            for chunk_id in ids:
+                if chunk_id in self._documents:
+                    self._remove_one(chunk_id)
+
+    def _remove_one(self, chunk_id: str):
+        for term in set(tokenize(self._documents[chunk_id]["text"])):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(chunk_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(chunk_id)
+        del self._documents[chunk_id]
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._doc_lengths.clear()
+            self._documents.clear()
+            self._total_length = 0
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (chunk_id, score) pairs, best first"""
+        with self._lock:
+            doc_count = len(self._documents)
+            if not doc_count:
+                return []
+            avg_length = self._total_length / doc_count
+            scores: Dict[str, float] = {}
+
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                for chunk_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[chunk_id] / avg_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def copy(self) -> "BM25Index":
+        """Independent copy (postings included, nothing re-tokenized)"""
+        with self._lock:
+            clone = BM25Index(k1=self.k1, b=self.b)
+            clone._postings = {term: dict(postings) for term, postings in self._postings.items()}
+            clone._doc_lengths = dict(self._doc_lengths)
+            clone._documents = dict(self._documents)
+            clone._total_length = self._total_length
+        return clone
+
+    def get(self, chunk_id: str) -> Optional[dict]:
+        """{"text", "metadata"} for a chunk, or None"""
+        with self._lock:
+            return self._documents.get(chunk_id)
+
+    def save(self, path: str):
+        """Persist the chunks; postings are rebuilt on load"""
+        with self._lock:
+            payload = {"k1": self.k1, "b": self.b, "documents": self._documents}
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        index = cls(k1=payload.get("k1", 1.5), b=payload.get("b", 0.75))
+        documents = payload.get("documents", {})
+        index.add(
+            documents.keys(),
+            [doc["text"] for doc in documents.values()],
+            [doc["metadata"] for doc in documents.values()]
+        )
+        return index
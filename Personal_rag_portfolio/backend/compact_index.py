@@ -0,0 +1,155 @@
+"""
+backend/compact_index.py - Memory-mapped float16/int8 vector index for small corpora
+
+A personal knowledge base is a few thousand 384-d vectors: one matrix
+product and an argpartition answer a query in about a millisecond,
+without Chroma's client, SQLite and HNSW layers in between.
+
+int8 (per-row scaled) is the fast default: 4x smaller than float32 and
+cheap to widen. float16 is closer to exact, but NumPy widens it to
+float32 slowly, so each query costs a few milliseconds more.
+"""
+import os
+import json
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DTYPES = ("int8", "float16")
+SEARCH_BLOCK_ROWS = 8192  # bounds the float32 temporary created per query batch
+
+
+class CompactVectorIndex:
+    """Normalized embeddings in one contiguous matrix, with their chunks.
+
+    Scores are cosine similarities (higher is better), which for unit
+    vectors equal the 1 - d/2 similarity Chroma-backed search reports, so
+    results from both backends can be merged and fused alike.
+    """
+
+    def __init__(self, ids: List[str], matrix: np.ndarray, documents: List[str],
+                 metadatas: List[dict], scales: Optional[np.ndarray] = None):
+        if matrix.dtype.name not in DTYPES:
+            raise ValueError(f"❌ Unsupported compact index dtype: {matrix.dtype}")
+        if matrix.dtype == np.int8 and scales is None:
+            raise ValueError("❌ int8 compact index needs per-row scales")
+        self.ids = list(ids)
+        self.matrix = matrix
+        self.scales = scales  # int8 only: row value = stored value * scale
+        self.documents = list(documents)
+        self.metadatas = [dict(metadata or {}) for metadata in metadatas]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.matrix.nbytes) + (int(self.scales.nbytes) if self.scales is not None else 0)
+
+    @staticmethod
+    def _encode(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.clip(norms, 1e-12, None)
+        if dtype == "int8":
+            # Symmetric per-row quantization: each row's largest component maps to 127
+            scales = np.clip(np.abs(vectors).max(axis=1), 1e-12, None) / 127.0
+            quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            return quantized, scales.astype(np.float32)
+        return vectors.astype(np.float16), None
+
+    @classmethod
+    def build(cls, ids: Sequence[str], embeddings, documents: Sequence[str],
+              metadatas: Sequence[dict], dtype: str = "int8") -> "CompactVectorIndex":
+        if dtype not in DTYPES:
+            raise ValueError(f"❌ Unsupported compact index dtype: {dtype}")
+        if not len(ids):
+            return cls([], np.zeros((0, 0), dtype=dtype), [], [], np.zeros(0, dtype=np.float32))
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        matrix, scales = cls._encode(vectors, dtype)
+        return cls(ids, matrix, documents, metadatas, scales)
+
+    @classmethod
+    def from_collection(cls, collection, dtype: str = "int8",
+                        page_size: int = 1000) -> "CompactVectorIndex":
+        """Copy every vector and chunk out of a Chroma collection"""
+        ids, embeddings, documents, metadatas = [], [], [], []
+        for offset in range(0, collection.count(), page_size):
+            stored = collection.get(limit=page_size, offset=offset,
+                                    include=["embeddings", "documents", "metadatas"])
+            ids.extend(stored["ids"])
+            embeddings.extend(stored["embeddings"])
+            documents.extend(stored["documents"])
+            metadatas.extend(stored["metadatas"])
+        return cls.build(ids, embeddings, documents, metadatas, dtype)
+
+    def save(self, prefix: str):
+        """Write <prefix>.npy (matrix) and <prefix>.json (ids, chunks, int8 scales)"""
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # np.save appends ".npy" to names without it, so keep the suffix on the temp file
+        tmp_matrix = prefix + ".tmp.npy"
+        np.save(tmp_matrix, np.ascontiguousarray(self.matrix))
+        with open(prefix + ".json.tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "ids": self.ids,
+                "documents": self.documents,
+                "metadatas": self.metadatas,
+                "scales": self.scales.tolist() if self.scales is not None else None,
+            }, f)
+        os.replace(tmp_matrix, prefix + ".npy")
+        os.replace(prefix + ".json.tmp", prefix + ".json")
+
+    @classmethod
+    def load(cls, prefix: str) -> "CompactVectorIndex":
+        """Memory-map the matrix (pages are read on demand, shared between processes)"""
+        with open(prefix + ".json", "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        matrix = np.load(prefix + ".npy", mmap_mode="r")
+        scales = payload.get("scales")
+        return cls(payload["ids"], matrix, payload["documents"], payload["metadatas"],
+                   np.asarray(scales, dtype=np.float32) if scales is not None else None)
+
+    @staticmethod
+    def remove_files(prefix: str):
+        for path in (prefix + ".npy", prefix + ".json"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _scores(self, queries: np.ndarray) -> np.ndarray:
+        """(queries x rows) cosine similarities, computed block by block"""
+        scores = np.empty((len(queries), len(self.ids)), dtype=np.float32)
+        for start in range(0, len(self.ids), SEARCH_BLOCK_ROWS):
+            block = np.asarray(self.matrix[start:start + SEARCH_BLOCK_ROWS], dtype=np.float32)
+            scores[:, start:start + len(block)] = queries @ block.T
+        if self.scales is not None:
+            scores *= self.scales[None, :]
+        return scores
+
+    def search_ids(self, vectors, k: int) -> List[List[Tuple[int, float]]]:
+        """Top-k (row, score) per query vector, best first"""
+        if k <= 0 or not len(self.ids) or not len(vectors):
+            return [[] for _ in range(len(vectors))]
+        queries = np.asarray(vectors, dtype=np.float32)
+        queries = queries / np.clip(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12, None)
+        scores = self._scores(queries)
+        k = min(k, scores.shape[1])
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(scores.shape[1]), (len(queries), 1))
+        results = []
+        for row_scores, rows in zip(scores, top):
+            ordered = rows[np.argsort(-row_scores[rows])]
+            results.append([(int(row), float(row_scores[row])) for row in ordered])
+        return results
+
+    def search_batch(self, vectors, k: int) -> List[List[Tuple[object, float]]]:
+        """Top-k (Document, similarity) per query vector"""
+        from langchain_core.documents import Document
+
+        return [
+            [(Document(page_content=self.documents[row], metadata=dict(self.metadatas[row])), score)
+             for row, score in hits]
+            for hits in self.search_ids(vectors, k)
+        ]
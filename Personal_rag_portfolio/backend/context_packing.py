@@ -0,0 +1,138 @@
+"""
+backend/context_packing.py - Assemble retrieved chunks into a compact prompt context
+
+Chunks are split with a 200-character overlap, so neighbouring hits from
+the same page repeat text. Packing merges them back into one passage per
+contiguous run, then fits the passages into a token budget in rank order.
+"""
+from typing import List, Optional, Tuple
+
+# Gemini has no local tokenizer; ~4 characters per token is close for English
+CHARS_PER_TOKEN = 4
+MIN_OVERLAP_CHARS = 20    # shorter suffix/prefix matches are treated as coincidence
+MAX_OVERLAP_CHARS = 400   # 2x the splitter overlap
+MIN_PARTIAL_TOKENS = 64   # don't add a truncated passage smaller than this
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _suffix_prefix_overlap(left: str, right: str) -> int:
+    """Length of the longest suffix of `left` that is a prefix of `right`"""
+    longest = min(len(left), len(right), MAX_OVERLAP_CHARS)
+    for size in range(longest, MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+class _Passage:
+    """Contiguous text from one page, built from one or more chunks"""
+
+    def __init__(self, doc, rank: int):
+        self.source = doc.metadata.get('source', 'PDF')
+        self.page = doc.metadata.get('page', 'N/A')
+        self.text = doc.page_content
+        self.start = doc.metadata.get('start_index')
+        self.rank = rank
+
+    @property
+    def end(self) -> Optional[int]:
+        return self.start + len(self.text) if self.start is not None else None
+
+    def merge(self, other: "_Passage") -> bool:
+        """Fold `other` into this passage if their texts overlap or touch, in either order"""
+        if self.start is not None and other.start is not None:
+            if other.start > self.end or self.start > other.end:
+                return False
+            first, second = (self, other) if self.start <= other.start else (other, self)
+            # Empty tail if `second` lies inside `first`
+            self.text = first.text + second.text[first.end - second.start:]
+            self.start = first.start
+        else:
+            # No offsets (e.g. chunks ingested before start_index was recorded): compare text
+            if self.text in other.text:
+                self.text = other.text
+            elif other.text not in self.text:
+                forward = _suffix_prefix_overlap(self.text, other.text)
+                backward = 0 if forward else _suffix_prefix_overlap(other.text, self.text)
+                if forward:
+                    self.text += other.text[forward:]
+                elif backward:
+                    self.text = other.text + self.text[backward:]
+                else:
+                    return False
+            self.start = None  # offsets are no longer reliable
+        self.rank = min(self.rank, other.rank)
+        return True
+
+
+def merge_chunks(docs) -> List[_Passage]:
+    """Merge same-page chunks whose text overlaps or touches; best rank first.
+
+    Every pair in a (source, page) group is tried, in both directions, until
+    nothing merges, so adjacent chunks join whatever order they ranked in.
+    Groups are a handful of chunks, so the quadratic passes are cheap.
+    """
+    groups = {}
+    for rank, doc in enumerate(docs):
+        key = (doc.metadata.get('source', 'PDF'), doc.metadata.get('page', 'N/A'))
+        groups.setdefault(key, []).append(_Passage(doc, rank))
+
+    passages = []
+    for group in groups.values():
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(group)):
+                for j in range(len(group) - 1, i, -1):
+                    if group[i].merge(group[j]):
+                        del group[j]
+                        merged = True
+        passages.extend(group)
+    passages.sort(key=lambda passage: passage.rank)
+    return passages
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    cut = text[:max_chars]
+    boundary = max(cut.rfind(". "), cut.rfind("\n"))
+    if boundary < max_chars // 2:
+        boundary = cut.rfind(" ")
+    return (cut[:boundary + 1] if boundary > 0 else cut).rstrip() + " …"
+
+
+def pack_context(docs, max_tokens: int) -> Tuple[str, dict]:
+    """Formatted context for the prompt plus packing stats.
+
+    Passages are added best-first until `max_tokens` is reached; the first
+    one that doesn't fit is truncated at a sentence/word boundary if enough
+    budget is left, and the rest are dropped.
+    """
+    passages = merge_chunks(docs)
+    blocks = []
+    used = 0
+    for i, passage in enumerate(passages, 1):
+        header = f"[Source {i}: {passage.source}, Page {passage.page}]\n"
+        block = header + passage.text
+        remaining = max_tokens - used
+        if estimate_tokens(block) > remaining:
+            if remaining - estimate_tokens(header) >= MIN_PARTIAL_TOKENS:
+                block = header + _truncate(passage.text, (remaining - estimate_tokens(header)) * CHARS_PER_TOKEN)
+                blocks.append(block)
+                used += estimate_tokens(block)
+            break
+        blocks.append(block)
+        used += estimate_tokens(block) + 1  # blank line between blocks
+
+    context = "\n\n".join(blocks)
+    raw_chars = sum(len(doc.page_content) for doc in docs)
+    return context, {
+        "chunks": len(docs),
+        "passages": len(passages),
+        "passages_packed": len(blocks),
+        "raw_chars": raw_chars,
+        "packed_chars": len(context),
+        "estimated_tokens": estimate_tokens(context),
+    }
@@ -0,0 +1,146 @@
+"""
+backend/embedding_cache.py - Thread-safe LRU cache for query embeddings
+"""
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from semantic_cache import normalize_query
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """Wrap an Embeddings object and memoize embed_query by normalized text.
+
+    all-MiniLM-L6-v2 lowercases its input, so case/whitespace normalization
+    doesn't change the vector. embed_documents (ingestion) passes straight
+    through. With `persist_path`, entries are also written to a small SQLite
+    file so the cache survives restarts.
+    """
+
+    def __init__(self, base: Embeddings, max_entries: int = 2048,
+                 persist_path: Optional[str] = None):
+        self.base = base
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if persist_path:
+            directory = os.path.dirname(persist_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(persist_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+            )
+            self._db.commit()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(vector)
+            vector = self._disk_get(key)
+            if vector is not None:
+                self.disk_hits += 1
+                self._remember(key, vector)
+                return list(vector)
+            self.misses += 1
+
+        # Encode outside the lock so concurrent misses don't serialize
+        vector = list(self.base.embed_query(text))
+
+        with self._lock:
+            self._remember(key, vector)
+            self._disk_put(key, vector)
+        return list(vector)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries at once; only cache misses are encoded, in one batch"""
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing = {}  # normalized key -> indices of texts that need it
+
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = normalize_query(text)
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                elif key not in missing:
+                    vector = self._disk_get(key)
+                    if vector is not None:
+                        self.disk_hits += 1
+                        self._remember(key, vector)
+                if vector is not None:
+                    results[i] = list(vector)
+                else:
+                    missing.setdefault(key, []).append(i)
+            self.misses += len(missing)
+
+        if missing:
+            keys = list(missing)
+            # MiniLM has no query prefix, so a document batch encodes queries identically
+            vectors = self.base.embed_documents([texts[missing[key][0]] for key in keys])
+            with self._lock:
+                for key, vector in zip(keys, vectors):
+                    vector = list(vector)
+                    self._remember(key, vector)
+                    self._disk_put(key, vector)
+                    for i in missing[key]:
+                        results[i] = list(vector)
+        return results
+
+    def _remember(self, key: str, vector: List[float]):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[List[float]]:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT vector FROM query_embeddings WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return array("f", row[0]).tolist()
+
+    def _disk_put(self, key: str, vector: List[float]):
+        if self._db is None:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO query_embeddings (key, vector) VALUES (?, ?)",
+            (key, array("f", vector).tobytes())
+        )
+        self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "max_entries": self.max_entries,
+                "persist_path": self.persist_path,
+            }
@@ -0,0 +1,121 @@
+"""
+backend/ingestion_jobs.py - Background PDF ingestion with progress tracking
+"""
+import os
+import time
+import uuid
+import queue
+import threading
+from typing import Callable, Dict, List, Optional
+
+# Finished jobs kept around for status lookups
+MAX_FINISHED_JOBS = 100
+
+
+class IngestionJobQueue:
+    """FIFO queue of PDF ingestion jobs served by one background worker.
+    
+    Ingestions share one vector store, so they run one at a time; the HTTP
+    request only enqueues the job and returns its ID.
+    """
+    
+    def __init__(self, get_rag_system: Callable[[], object]):
+        self._get_rag_system = get_rag_system
+        self._jobs: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="ingest-worker", daemon=True)
+        self._worker.start()
+    
+    def submit(self, pdf_path: str, source_name: str, namespace: str) -> dict:
+        """Queue a spooled PDF for ingestion; the worker deletes the file afterwards"""
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "source_name": source_name,
+            "namespace": namespace,
+            "pdf_path": pdf_path,
+            "state": "queued",
+            "error": None,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "pages_loaded": 0,
+            "chunks_total": 0,
+            "chunks_embedded": 0,
+            "chunks_per_second": None,  # embedding throughput, reported by the pipeline
+            "chunks_created": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        self._queue.put(job_id)
+        return self.get(job_id)
+    
+    def get(self, job_id: str) -> Optional[dict]:
+        """Snapshot of a job's status, or None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._public_view(job) if job else None
+    
+    def list(self) -> List[dict]:
+        with self._lock:
+            return [self._public_view(job) for job in self._jobs.values()]
+    
+    @staticmethod
+    def _public_view(job: dict) -> dict:
+        view = {key: value for key, value in job.items() if key != "pdf_path"}
+        view["queue_seconds"] = None
+        view["elapsed_seconds"] = None
+        view["end_to_end_chunks_per_second"] = None
+        if job["started_at"]:
+            view["queue_seconds"] = round(job["started_at"] - job["submitted_at"], 3)
+            end = job["finished_at"] or time.time()
+            elapsed = max(end - job["started_at"], 1e-9)
+            view["elapsed_seconds"] = round(elapsed, 3)
+            # Includes loading, splitting and publishing, unlike chunks_per_second
+            view["end_to_end_chunks_per_second"] = round(job["chunks_embedded"] / elapsed, 2)
+        return view
+    
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+    
+    def _prune(self):
+        with self._lock:
+            finished = [
+                job for job in self._jobs.values()
+                if job["state"] in ("completed", "failed")
+            ]
+            finished.sort(key=lambda job: job["finished_at"])
+            for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self._jobs[job["job_id"]]
+    
+    def _run(self):
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                job = dict(self._jobs[job_id])
+            self._update(job_id, state="running", started_at=time.time())
+            print(f"\n📥 Ingestion job {job_id[:8]} started: {job['source_name']}")
+            
+            try:
+                rag_system = self._get_rag_system()
+                chunks_created = rag_system.process_pdf(
+                    job["pdf_path"],
+                    source_name=job["source_name"],
+                    namespace=job["namespace"],
+                    progress=lambda counters: self._update(job_id, **counters)
+                )
+                self._update(job_id, state="completed", chunks_created=chunks_created,
+                             finished_at=time.time())
+                print(f"✅ Ingestion job {job_id[:8]} completed")
+            except Exception as e:
+                self._update(job_id, state="failed", error=str(e), finished_at=time.time())
+                print(f"❌ Ingestion job {job_id[:8]} failed: {e}")
+            finally:
+                try:
+                    os.remove(job["pdf_path"])
+                except OSError:
+                    pass
+                self._queue.task_done()
+                self._prune()
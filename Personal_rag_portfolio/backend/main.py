@@ -2,13 +2,25 @@
 backend/main.py - UPDATED without memory dependencies
 """
 import os
-from fastapi import FastAPI, UploadFile, File, HTTPException
+import json
+import asyncio
+import functools
+import shutil
+import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 
 # Import our SIMPLIFIED RAG system
 from rag_system import LukmanRAGSystem
+from ingestion_jobs import IngestionJobQueue
+from namespaces import namespace_slug, validate_namespace
+import metrics
 
 # Initialize FastAPI
 app = FastAPI(
@@ -26,12 +38,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency (route templates, not raw paths, keep label cardinality low)
+HTTP_REQUEST_SECONDS = metrics.REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route", "status")
+)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code
+    )
+    return response
+
 # Initialize RAG system
 rag_system = None
 
+# Blocking RAG work (PDF parsing, embedding, Chroma, Gemini) runs on this
+# bounded pool so the event loop keeps serving status/health requests
+RAG_WORKERS = int(os.getenv("RAG_WORKERS", "4"))
+rag_executor = ThreadPoolExecutor(max_workers=RAG_WORKERS, thread_name_prefix="rag-worker")
+
+# Streaming answers hold a thread per pull while waiting for the next token, so
+# they get their own pool: slow stream readers can't starve chat/upload/namespace calls
+RAG_STREAM_WORKERS = int(os.getenv("RAG_STREAM_WORKERS", "16"))
+stream_executor = ThreadPoolExecutor(max_workers=RAG_STREAM_WORKERS, thread_name_prefix="rag-stream")
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a synchronous RAG call on the worker pool without blocking the loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(rag_executor, functools.partial(func, *args, **kwargs))
+
+async def run_streaming(func, *args):
+    """Like run_blocking, on the streaming pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(stream_executor, functools.partial(func, *args))
+
+# Uploads are streamed to unique spool files here, then ingested in the background
+UPLOAD_SPOOL_DIR = os.getenv(
+    "RAG_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "lukman_rag_uploads")
+)
+
+def _get_or_create_rag_system():
+    """Used by the ingestion worker thread"""
+    global rag_system
+    if rag_system is None:
+        rag_system = LukmanRAGSystem()
+    return rag_system
+
+ingestion_jobs = IngestionJobQueue(_get_or_create_rag_system)
+
 # SIMPLIFIED models
 class ChatMessage(BaseModel):
     message: str
+    namespaces: Optional[List[str]] = None  # default: search every namespace
 
 class ChatResponse(BaseModel):
     response: str
@@ -43,13 +108,14 @@ class SystemStatus(BaseModel):
     vector_db_ready: bool
     llm_connected: bool
     total_chunks: int
+    query_batching: Optional[dict] = None
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize RAG system on startup"""
     global rag_system
     try:
-        rag_system = LukmanRAGSystem()
+        rag_system = await run_blocking(LukmanRAGSystem)
         print("\n" + "="*60)
         print("✅ LUKMAN'S RAG SYSTEM STARTED (Simplified)")
         print("="*60)
@@ -59,6 +125,12 @@ async def startup_event():
         print(f"⚠️  RAG System initialization failed: {e}")
         rag_system = None
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the RAG worker pools"""
+    rag_executor.shutdown(wait=False, cancel_futures=True)
+    stream_executor.shutdown(wait=False, cancel_futures=True)
+
 @app.get("/")
 async def root():
     return {
@@ -67,8 +139,14 @@ async def root():
         "note": "No memory modules - Simple & Reliable",
         "endpoints": {
             "chat": "POST /api/chat",
+            "chat_stream": "POST /api/chat/stream",
             "status": "GET /api/status",
+            "health": "GET /api/health",
+            "metrics": "GET /api/metrics",
             "upload": "POST /api/upload-pdf",
+            "jobs": "GET /api/jobs/{job_id}",
+            "namespaces": "GET /api/namespaces",
+            "delete_namespace": "DELETE /api/namespaces/{name}",
             "profile": "GET /api/profile"
         }
     }
@@ -91,7 +169,20 @@ async def get_status():
         pdf_loaded=status["pdf_loaded"],
         vector_db_ready=status["vector_db_ready"],
         llm_connected=status["llm_connected"],
-        total_chunks=status["total_chunks"]
+        total_chunks=status["total_chunks"],
+        query_batching=status.get("query_batching")
+    )
+
+@app.get("/api/health")
+async def health():
+    """Liveness check - never touches the RAG system"""
+    return {"status": "ok"}
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Stage latency histograms and counters in Prometheus text format"""
+    return PlainTextResponse(
+        metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
     )
 
 @app.post("/api/chat", response_model=ChatResponse)
@@ -101,43 +192,136 @@ async def chat(message: ChatMessage):
         raise HTTPException(status_code=503, detail="RAG system not initialized")
     
     try:
-        response, sources = rag_system.get_response(message.message)
+        response, sources = await run_blocking(
+            rag_system.get_response, message.message, namespaces=message.namespaces
+        )
         return ChatResponse(response=response, sources=sources)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
-@app.post("/api/upload-pdf")
-async def upload_pdf(file: UploadFile = File(...)):
-    """Upload and process a new PDF"""
-    if not file.filename.endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files allowed")
+def _sse_event(event: str, data) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/api/chat/stream")
+async def chat_stream(message: ChatMessage):
+    """Stream chat as server-sent events: sources, token..., done"""
+    if not rag_system:
+        raise HTTPException(status_code=503, detail="RAG system not initialized")
     
-    try:
-        # Save uploaded file
-        temp_path = f"temp_{file.filename}"
-        content = await file.read()
-        with open(temp_path, "wb") as f:
-            f.write(content)
+    async def event_stream():
+        events = rag_system.stream_response(message.message, namespaces=message.namespaces)
+        # A pull can still be running on a worker when the client disconnects;
+        # close() waits for it instead of failing with "generator already executing"
+        events_lock = threading.Lock()
         
-        # Process with RAG system
-        global rag_system
-        if rag_system is None:
-            rag_system = LukmanRAGSystem()
+        def pull():
+            with events_lock:
+                return next(events, None)
         
-        chunks_created = rag_system.process_pdf(temp_path)
+        def close():
+            with events_lock:
+                events.close()
         
-        # Cleanup
-        os.remove(temp_path)
+        try:
+            # Pull each event on the streaming pool: retrieval and token waits block
+            while True:
+                item = await run_streaming(pull)
+                if item is None:
+                    break
+                event, data = item
+                yield _sse_event(event, data)
+            yield _sse_event("done", {})
+        except Exception as e:
+            # Headers are already sent - report the failure in-band
+            yield _sse_event("error", {"detail": f"Error: {str(e)}"})
+        finally:
+            # Stops the LLM stream on disconnect; shielded so a cancelled request still closes it
+            await asyncio.shield(run_streaming(close))
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _spool_upload(source) -> str:
+    """Copy an upload stream to a unique spool file in fixed-size blocks"""
+    os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+    fd, spool_path = tempfile.mkstemp(prefix="upload_", suffix=".pdf", dir=UPLOAD_SPOOL_DIR)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            shutil.copyfileobj(source, f, length=1024 * 1024)
+    except Exception:
+        os.remove(spool_path)
+        raise
+    return spool_path
+
+@app.post("/api/upload-pdf", status_code=202)
+async def upload_pdf(file: UploadFile = File(...), namespace: Optional[str] = Form(None)):
+    """Upload a PDF and queue it for background ingestion.
+    
+    Each document gets its own namespace (derived from the filename)
+    unless `namespace` is given.
+    """
+    if not file.filename.endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files allowed")
+    
+    try:
+        namespace = validate_namespace(namespace or namespace_slug(file.filename))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        spool_path = await run_blocking(_spool_upload, file.file)
+        job = ingestion_jobs.submit(spool_path, source_name=file.filename, namespace=namespace)
         
         return {
             "success": True,
-            "message": f"PDF processed: {file.filename}",
-            "chunks_created": chunks_created
+            "message": f"PDF queued for processing: {file.filename}",
+            "namespace": namespace,
+            "job_id": job["job_id"],
+            "status_url": f"/api/jobs/{job['job_id']}"
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+@app.get("/api/jobs")
+async def list_jobs():
+    """List recent ingestion jobs"""
+    return {"jobs": ingestion_jobs.list()}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Ingestion job status: state, pages loaded, chunks embedded, throughput"""
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/namespaces")
+async def list_namespaces():
+    """List namespaces with their sources and chunk counts"""
+    if not rag_system:
+        return {"namespaces": []}
+    return {"namespaces": await run_blocking(rag_system.list_namespaces)}
+
+@app.delete("/api/namespaces/{name}")
+async def delete_namespace(name: str):
+    """Delete a namespace and everything ingested into it"""
+    if not rag_system:
+        raise HTTPException(status_code=503, detail="RAG system not initialized")
+    
+    try:
+        await run_blocking(rag_system.delete_namespace, name)
+        return {"success": True, "message": f"Namespace deleted: {name}"}
+    except KeyError:
+        # Unknown, or deleted by a concurrent request
+        raise HTTPException(status_code=404, detail="Namespace not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
 @app.get("/api/profile")
 async def get_profile():
     """Get Lukman's profile"""
@@ -0,0 +1,68 @@
+"""
+backend/metrics_callbacks.py - LangChain callback that feeds stage timings into metrics
+"""
+import time
+from typing import Dict, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+import metrics
+
+
+class StageTimingHandler(BaseCallbackHandler):
+    """Times LLM calls and named chain steps for both invoke() and stream().
+
+    Every LLM run (including retries and fallbacks) is recorded as "llm",
+    plus "llm_first_token" when tokens are streamed. Chain steps are
+    matched by run name via `chain_stages` (run name -> stage).
+    """
+
+    def __init__(self, chain_stages: Dict[str, str] = None):
+        self.chain_stages = dict(chain_stages or {})
+        self._started: Dict[UUID, Tuple[str, float]] = {}
+        self._awaiting_first_token: Dict[UUID, float] = {}
+
+    def _start(self, run_id: UUID, stage: str):
+        now = time.perf_counter()
+        self._started[run_id] = (stage, now)
+        if stage == "llm":
+            self._awaiting_first_token[run_id] = now
+
+    def _end(self, run_id: UUID, failed: bool = False):
+        self._awaiting_first_token.pop(run_id, None)
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        stage, start = started
+        metrics.observe_stage(stage, time.perf_counter() - start)
+        if failed:
+            metrics.STAGE_ERRORS.inc(stage=stage)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._start(run_id, "llm")
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._start(run_id, "llm")
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs):
+        start = self._awaiting_first_token.pop(run_id, None)
+        if start is not None:
+            metrics.observe_stage("llm_first_token", time.perf_counter() - start)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        self._end(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end(run_id, failed=True)
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, **kwargs):
+        stage = self.chain_stages.get(kwargs.get("name") or (serialized or {}).get("name"))
+        if stage:
+            self._start(run_id, stage)
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end(run_id, failed=True)
@@ -0,0 +1,512 @@
+"""
+backend/namespaces.py - Per-document/tenant Chroma collections and their registry
+"""
+import os
+import re
+import json
+import time
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from bm25_index import BM25Index
+
+DEFAULT_NAMESPACE = "knowledge"
+COLLECTION_PREFIX = "lukman_"  # default namespace -> "lukman_knowledge" (pre-namespace name)
+REGISTRY_FILE = "namespaces.json"
+MANIFEST_FILE = "ingest_manifest.json"
+LEXICAL_INDEX_FILE = "bm25_index.json"
+COMPACT_INDEX_DIR = "compact"
+VECTOR_BACKENDS = ("chroma", "compact")
+
+NAMESPACE_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{1,46}[a-z0-9]$")
+
+
+def namespace_slug(text: str) -> str:
+    """Turn a filename or label into a valid namespace name"""
+    base = os.path.splitext(os.path.basename(text))[0].lower()
+    slug = re.sub(r"[^a-z0-9_-]+", "-", base).strip("-_")[:48].strip("-_")
+    return slug if len(slug) >= 3 else f"doc-{slug or 'upload'}"
+
+
+def validate_namespace(name: str) -> str:
+    if not NAMESPACE_PATTERN.match(name):
+        raise ValueError(
+            f"❌ Invalid namespace '{name}': use 3-48 lowercase letters, digits, '-' or '_'"
+        )
+    return name
+
+
+class IndexSnapshot:
+    """One generation of a namespace's index: a Chroma collection and its BM25 index.
+
+    Published snapshots are never modified. Readers pin one with
+    KnowledgeNamespace.acquire(); when a newer generation replaces it,
+    its collection is dropped once the last reader has let go. With
+    `compact_prefix`, vector search is served from a CompactVectorIndex
+    built from (and stored next to) the collection instead of Chroma.
+    """
+
+    def __init__(self, client, collection_name: str, lexical_index: Optional[BM25Index] = None,
+                 lexical_loader: Optional[Callable[["IndexSnapshot"], BM25Index]] = None,
+                 compact_prefix: Optional[str] = None, compact_dtype: str = "int8"):
+        self._client = client
+        self.collection_name = collection_name
+        self.collection = client.get_or_create_collection(
+            name=collection_name, embedding_function=None
+        )
+        self.lexical_index = lexical_index
+        self._lexical_loader = lexical_loader
+        self.compact_prefix = compact_prefix
+        self.compact_dtype = compact_dtype
+        self._compact = None
+        self._compact_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._readers = 0
+        self._retired = False
+        self.dropped = False
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def open_lexical_index(self) -> BM25Index:
+        if self.lexical_index is None:
+            with self._lock:
+                if self.lexical_index is None:
+                    self.lexical_index = self._lexical_loader(self) if self._lexical_loader else BM25Index()
+        return self.lexical_index
+
+    def compact_index(self):
+        """The memory-mapped index for this generation, loaded or built on first use"""
+        if self._compact is None:
+            with self._compact_lock:
+                if self._compact is None:
+                    from compact_index import CompactVectorIndex
+                    
+                    index = None
+                    if os.path.exists(self.compact_prefix + ".npy") and \
+                            os.path.exists(self.compact_prefix + ".json"):
+                        index = CompactVectorIndex.load(self.compact_prefix)
+                        if index.matrix.dtype.name != self.compact_dtype or len(index) != self.count():
+                            index = None  # written with other settings or interrupted
+                    if index is None:
+                        index = CompactVectorIndex.from_collection(self.collection, self.compact_dtype)
+                        index.save(self.compact_prefix)
+                        index = CompactVectorIndex.load(self.compact_prefix)
+                    self._compact = index
+        return self._compact
+
+    def _pin(self):
+        with self._lock:
+            self._readers += 1
+
+    def _unpin(self):
+        with self._lock:
+            self._readers -= 1
+            drop = self._retired and self._readers == 0
+        if drop:
+            self._drop()
+
+    def retire(self):
+        """Drop the collection now if unused, otherwise when the last reader finishes"""
+        with self._lock:
+            self._retired = True
+            drop = self._readers == 0
+        if drop:
+            self._drop()
+
+    def _drop(self):
+        self.dropped = True
+        try:
+            self._client.delete_collection(self.collection_name)
+        except Exception as e:
+            print(f"⚠️  Could not drop retired collection {self.collection_name}: {e}")
+        if self.compact_prefix:
+            from compact_index import CompactVectorIndex
+            
+            self._compact = None
+            CompactVectorIndex.remove_files(self.compact_prefix)
+
+    def vector_search(self, vector: List[float], k: int) -> List[Tuple[object, float]]:
+        """Top-k (Document, similarity) by embedding; higher is better"""
+        return self.vector_search_batch([vector], k)[0]
+
+    def vector_search_batch(self, vectors: List[List[float]],
+                            k: int) -> List[List[Tuple[object, float]]]:
+        """vector_search for several query vectors in one Chroma query (or one matrix product)"""
+        if self.compact_prefix:
+            return self.compact_index().search_batch(vectors, k)
+        count = self.count()
+        if k <= 0 or count == 0 or not vectors:
+            return [[] for _ in vectors]
+        result = self.collection.query(
+            query_embeddings=vectors,
+            n_results=min(k, count),
+            include=["documents", "metadatas", "distances"]
+        )
+        return [
+            self._to_documents(texts, metadatas, distances)
+            for texts, metadatas, distances in zip(
+                result["documents"], result["metadatas"], result["distances"]
+            )
+        ]
+
+    @staticmethod
+    def _to_documents(texts, metadatas, distances) -> List[Tuple[object, float]]:
+        from langchain_core.documents import Document
+
+        # Squared L2 between unit vectors = 2 - 2*cosine
+        return [
+            (Document(page_content=text, metadata=dict(metadata or {})), 1.0 - distance / 2.0)
+            for text, metadata, distance in zip(texts, metadatas, distances)
+        ]
+
+    def lexical_search(self, query: str, k: int) -> List[Tuple[object, float]]:
+        """Top-k (Document, BM25 score)"""
+        from langchain_core.documents import Document
+
+        hits = []
+        index = self.open_lexical_index()
+        for chunk_id, score in index.search(query, k):
+            stored = index.get(chunk_id)
+            if stored is not None:
+                hits.append((Document(page_content=stored["text"],
+                                      metadata=dict(stored["metadata"])), score))
+        return hits
+
+
+class KnowledgeNamespace:
+    """A namespace's published index plus its ingest manifest.
+
+    Queries run against the active IndexSnapshot (read-copy-update):
+    ingestion builds the next generation in a staging collection and
+    publish() swaps it in atomically, so readers never see a half-built
+    index. The default namespace keeps the original file locations;
+    others live under <persist_directory>/namespaces/<name>/.
+    """
+
+    def __init__(self, name: str, client, persist_directory: str, collection_name: str,
+                 generation: int = 0,
+                 on_publish: Optional[Callable[[str, str, int], None]] = None,
+                 vector_backend: str = "chroma", compact_dtype: str = "int8",
+                 keep_collections: Sequence[str] = ()):
+        self.name = name
+        if name == DEFAULT_NAMESPACE:
+            self.directory = persist_directory
+        else:
+            self.directory = os.path.join(persist_directory, "namespaces", name)
+        self._client = client
+        self._on_publish = on_publish
+        self.vector_backend = vector_backend
+        self.compact_dtype = compact_dtype
+        self.generation = generation
+        # Held for a whole ingest: one writer per namespace at a time
+        self.write_lock = threading.RLock()
+        self._swap_lock = threading.Lock()
+        self._active = self._snapshot(collection_name, lexical_loader=self._load_lexical_index)
+        self._drop_orphaned_generations(keep_collections)
+
+    def _snapshot(self, collection_name: str, **kwargs) -> IndexSnapshot:
+        compact_prefix = None
+        if self.vector_backend == "compact":
+            compact_prefix = os.path.join(self.directory, COMPACT_INDEX_DIR, collection_name)
+        return IndexSnapshot(self._client, collection_name, compact_prefix=compact_prefix,
+                             compact_dtype=self.compact_dtype, **kwargs)
+
+    @property
+    def collection_name(self) -> str:
+        return self._active.collection_name
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_FILE)
+
+    @property
+    def lexical_index_path(self) -> str:
+        return os.path.join(self.directory, LEXICAL_INDEX_FILE)
+
+    def count(self) -> int:
+        return self._active.count()
+
+    def load_manifest(self) -> dict:
+        """Ingestion manifest: source name -> file hash + chunk IDs"""
+        if not os.path.exists(self.manifest_path):
+            return {"sources": {}}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_manifest(self, manifest: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _load_lexical_index(self, snapshot: IndexSnapshot) -> BM25Index:
+        """Load the persisted BM25 index, backfilling it from Chroma if missing"""
+        if os.path.exists(self.lexical_index_path):
+            return BM25Index.load(self.lexical_index_path)
+        index = BM25Index()
+        if os.path.exists(self.manifest_path) and snapshot.count() > 0:
+            stored = snapshot.collection.get(include=["documents", "metadatas"])
+            index.add(stored["ids"], stored["documents"], stored["metadatas"])
+            index.save(self.lexical_index_path)
+            print(f"   Built BM25 index for '{self.name}' from {len(index)} chunks")
+        return index
+
+    def open_lexical_index(self) -> BM25Index:
+        return self._active.open_lexical_index()
+
+    @contextmanager
+    def acquire(self) -> Iterator[IndexSnapshot]:
+        """Pin the active snapshot for the duration of a query"""
+        with self._swap_lock:
+            snapshot = self._active
+            snapshot._pin()
+        try:
+            yield snapshot
+        finally:
+            snapshot._unpin()
+
+    def _generation_prefix(self) -> str:
+        # "." can't occur in namespace names, so no other namespace shares this prefix
+        return f"{COLLECTION_PREFIX}{self.name}.g"
+
+    def _drop_orphaned_generations(self, keep: Sequence[str] = ()):
+        """Remove staging collections left behind by an interrupted ingest.
+
+        `keep` names collections of a deleted namespace with the same name
+        that are still being read; they drop themselves when released.
+        """
+        prefix = self._generation_prefix()
+        for collection in self._client.list_collections():
+            collection_name = getattr(collection, "name", collection)
+            if collection_name.startswith(prefix) and collection_name != self.collection_name \
+                    and collection_name not in keep and collection_name[len(prefix):].isdigit():
+                self._client.delete_collection(collection_name)
+                print(f"   Dropped orphaned staging collection {collection_name}")
+
+        compact_dir = os.path.join(self.directory, COMPACT_INDEX_DIR)
+        if os.path.isdir(compact_dir):
+            kept_files = {name + suffix for name in (self.collection_name, *keep)
+                          for suffix in (".npy", ".json")}
+            for filename in os.listdir(compact_dir):
+                if filename not in kept_files:
+                    os.remove(os.path.join(compact_dir, filename))
+
+    def stage(self, copy_existing: bool = True, page_size: int = 1000) -> IndexSnapshot:
+        """New generation to ingest into, optionally seeded with the active index.
+
+        Copying reuses the stored vectors, so unchanged chunks are never
+        re-embedded. Call with write_lock held; finish with publish() or
+        discard().
+
+        Trade-off: Chroma can't clone a collection, so the copy rewrites
+        every chunk in the namespace (vectors included) to its new
+        generation. Embedding work stays proportional to what changed,
+        but Chroma writes per ingest are O(namespace size). That buys
+        readers an atomic swap; for very large namespaces, split
+        documents across namespaces to keep each copy small.
+        """
+        staging = self._snapshot(
+            f"{self._generation_prefix()}{self.generation + 1}", lexical_index=BM25Index()
+        )
+        if copy_existing:
+            with self.acquire() as active:
+                for offset in range(0, active.count(), page_size):
+                    stored = active.collection.get(
+                        limit=page_size, offset=offset,
+                        include=["embeddings", "documents", "metadatas"]
+                    )
+                    if stored["ids"]:
+                        staging.collection.upsert(
+                            ids=stored["ids"], embeddings=stored["embeddings"],
+                            documents=stored["documents"], metadatas=stored["metadatas"]
+                        )
+                staging.lexical_index = active.open_lexical_index().copy()
+        return staging
+
+    def publish(self, staging: IndexSnapshot):
+        """Make `staging` the active index; the old one is dropped once unused"""
+        staging.open_lexical_index().save(self.lexical_index_path)
+        if staging.compact_prefix:
+            staging.compact_index()  # built before the swap, not on the first query after it
+        generation = self.generation + 1
+        if self._on_publish:
+            self._on_publish(self.name, staging.collection_name, generation)
+        with self._swap_lock:
+            previous, self._active = self._active, staging
+            self.generation = generation
+        previous.retire()
+
+    def discard(self, staging: IndexSnapshot):
+        staging.retire()
+
+    def retire(self) -> IndexSnapshot:
+        """Drop the active index (namespace deletion); in-flight queries finish first"""
+        with self._swap_lock:
+            snapshot = self._active
+        snapshot.retire()
+        return snapshot
+
+    def vector_search(self, vector: List[float], k: int) -> List[Tuple[object, float]]:
+        with self.acquire() as snapshot:
+            return snapshot.vector_search(vector, k)
+
+    def lexical_search(self, query: str, k: int) -> List[Tuple[object, float]]:
+        with self.acquire() as snapshot:
+            return snapshot.lexical_search(query, k)
+
+
+class NamespaceRegistry:
+    """Registry of namespaces persisted in <persist_directory>/namespaces.json.
+
+    Opening the Chroma client is deferred until a namespace is actually
+    used, so listing names stays cheap.
+    """
+
+    def __init__(self, persist_directory: str, vector_backend: str = "chroma",
+                 compact_dtype: str = "int8"):
+        if vector_backend not in VECTOR_BACKENDS:
+            raise ValueError(f"❌ Unknown vector backend: {vector_backend}")
+        self.persist_directory = persist_directory
+        self.vector_backend = vector_backend
+        self.compact_dtype = compact_dtype
+        self.registry_path = os.path.join(persist_directory, REGISTRY_FILE)
+        self._client = None
+        self._open: Dict[str, KnowledgeNamespace] = {}
+        # Retired snapshots of deleted namespaces that readers still hold
+        self._draining: Dict[str, List[IndexSnapshot]] = {}
+        self._lock = threading.RLock()
+        self._registry = self._load()
+
+    def _load(self) -> dict:
+        if os.path.exists(self.registry_path):
+            with open(self.registry_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        registry = {"namespaces": {}}
+        # Stores ingested before namespaces existed become the default namespace
+        if os.path.exists(os.path.join(self.persist_directory, MANIFEST_FILE)):
+            registry["namespaces"][DEFAULT_NAMESPACE] = {
+                "collection": COLLECTION_PREFIX + DEFAULT_NAMESPACE,
+                "created_at": time.time()
+            }
+        return registry
+
+    def _save(self):
+        os.makedirs(self.persist_directory, exist_ok=True)
+        tmp_path = self.registry_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._registry, f, indent=2)
+        os.replace(tmp_path, self.registry_path)
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import chromadb
+                    self._client = chromadb.PersistentClient(path=self.persist_directory)
+        return self._client
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._registry["namespaces"])
+
+    def exists(self, name: str) -> bool:
+        with self._lock:
+            return name in self._registry["namespaces"]
+
+    def get(self, name: str, create: bool = False) -> KnowledgeNamespace:
+        with self._lock:
+            if name not in self._registry["namespaces"]:
+                if not create:
+                    raise KeyError(f"Unknown namespace: {name}")
+                validate_namespace(name)
+                entry = {"collection": COLLECTION_PREFIX + name, "created_at": time.time()}
+                # A recreated namespace continues the deleted one's generations, so
+                # its collections never share a name with a retired, pending drop
+                last_generation = self._registry.get("deleted_generations", {}).pop(name, None)
+                if last_generation is not None:
+                    entry["generation"] = last_generation + 1
+                    entry["collection"] = f"{COLLECTION_PREFIX}{name}.g{entry['generation']}"
+                self._registry["namespaces"][name] = entry
+                self._save()
+            if name not in self._open:
+                entry = self._registry["namespaces"][name]
+                draining = [snapshot.collection_name for snapshot in self._draining.pop(name, [])
+                            if not snapshot.dropped]
+                self._open[name] = KnowledgeNamespace(
+                    name, self.client, self.persist_directory,
+                    collection_name=entry["collection"],
+                    generation=entry.get("generation", 0),
+                    on_publish=self._record_publish,
+                    vector_backend=self.vector_backend,
+                    compact_dtype=self.compact_dtype,
+                    keep_collections=draining
+                )
+            return self._open[name]
+
+    @contextmanager
+    def writing(self, name: str, create: bool = False) -> Iterator[KnowledgeNamespace]:
+        """Hold the namespace's write lock (ingest, delete).
+
+        If the namespace is deleted while we wait for the lock, the lookup
+        is retried, so the caller never writes into a deleted namespace.
+        """
+        while True:
+            namespace = self.get(name, create=create)
+            with namespace.write_lock:
+                with self._lock:
+                    current = self._open.get(name) is namespace
+                if current:
+                    yield namespace
+                    return
+
+    def _record_publish(self, name: str, collection_name: str, generation: int):
+        """Persist the new active collection before readers are switched to it"""
+        with self._lock:
+            entry = self._registry["namespaces"].get(name)
+            if entry is None:
+                raise ValueError(f"❌ Namespace '{name}' was deleted during ingest")
+            entry["collection"] = collection_name
+            entry["generation"] = generation
+            entry["published_at"] = time.time()
+            self._save()
+
+    def list(self) -> List[dict]:
+        """Namespaces with their sources and chunk counts"""
+        listing = []
+        for name in self.names():
+            namespace = self.get(name)
+            with self._lock:
+                entry = dict(self._registry["namespaces"][name])
+            listing.append({
+                "name": name,
+                "collection": entry["collection"],
+                "created_at": entry["created_at"],
+                "chunks": namespace.count(),
+                "sources": sorted(namespace.load_manifest()["sources"]),
+            })
+        return listing
+
+    def delete(self, name: str):
+        """Drop the namespace's collection (after in-flight queries), manifest and BM25 index.
+
+        Waits for a running ingest into the namespace to publish or discard.
+        """
+        with self.writing(name) as namespace, self._lock:
+            snapshot = namespace.retire()
+            if not snapshot.dropped:
+                self._draining.setdefault(name, []).append(snapshot)
+            if name == DEFAULT_NAMESPACE:
+                for path in (namespace.manifest_path, namespace.lexical_index_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+            else:
+                shutil.rmtree(namespace.directory, ignore_errors=True)
+            del self._registry["namespaces"][name]
+            self._registry.setdefault("deleted_generations", {})[name] = namespace.generation
+            self._open.pop(name, None)
+            self._save()
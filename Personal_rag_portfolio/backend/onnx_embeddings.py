@@ -0,0 +1,114 @@
+"""
+backend/onnx_embeddings.py - all-MiniLM-L6-v2 on ONNX Runtime (int8, CPU)
+
+Optional backend: needs `onnxruntime` and `transformers` (torch is only
+used once, to export the model). The exported/quantized model and the
+tokenizer are cached on disk, so later starts skip the export.
+"""
+import os
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+MAX_SEQ_LENGTH = 256  # same limit sentence-transformers uses for this model
+
+
+class OnnxMiniLMEmbeddings(Embeddings):
+    """Mean-pooled, L2-normalized MiniLM embeddings via ONNX Runtime.
+
+    Keeps the contract of HuggingFaceEmbeddings(normalize_embeddings=True),
+    so vectors can be mixed with ones already stored in Chroma.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, cache_dir: str = "./onnx_models",
+                 num_threads: Optional[int] = None, quantize: bool = True,
+                 batch_size: int = 32):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.quantize = quantize
+        self.model_dir = os.path.join(cache_dir, model_name.replace("/", "__"))
+        model_path = self._ensure_exported()
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.inter_op_num_threads = 1
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {node.name for node in self.session.get_inputs()}
+
+    def _ensure_exported(self) -> str:
+        """Export to ONNX (and quantize) once; reuse the cached file afterwards"""
+        fp32_path = os.path.join(self.model_dir, "model.onnx")
+        int8_path = os.path.join(self.model_dir, "model.int8.onnx")
+        target = int8_path if self.quantize else fp32_path
+        if os.path.exists(target):
+            return target
+
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        print(f"   Exporting {self.model_name} to ONNX (one-time)...")
+        os.makedirs(self.model_dir, exist_ok=True)
+        tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        tokenizer.save_pretrained(self.model_dir)
+
+        if not os.path.exists(fp32_path):
+            model = AutoModel.from_pretrained(self.model_name)
+            model.eval()
+            sample = tokenizer(["export sample"], return_tensors="pt")
+            input_names = ["input_ids", "attention_mask", "token_type_ids"]
+            dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+            dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+            with torch.no_grad():
+                torch.onnx.export(
+                    model,
+                    tuple(sample[name] for name in input_names),
+                    fp32_path,
+                    input_names=input_names,
+                    output_names=["last_hidden_state"],
+                    dynamic_axes=dynamic_axes,
+                    opset_version=14
+                )
+
+        if self.quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+            print("   Quantized ONNX model to int8")
+        return target
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        import numpy as np
+
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            encoded = self.tokenizer(
+                batch, padding=True, truncation=True,
+                max_length=MAX_SEQ_LENGTH, return_tensors="np"
+            )
+            feeds = {
+                name: encoded[name].astype(np.int64)
+                for name in encoded if name in self._input_names
+            }
+            hidden = self.session.run(None, feeds)[0]
+
+            # Mean pooling over real tokens, then L2 normalization
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            vectors.extend(pooled.tolist())
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode(list(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0]
@@ -0,0 +1,124 @@
+"""
+backend/query_batcher.py - Coalesce concurrent queries into micro-batches
+"""
+import time
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, List
+
+import metrics
+
+
+class QueryBatcher:
+    """Collect concurrent requests for up to `window_ms` (or `max_batch_size`
+    items) and hand them to `process_batch` in one call.
+
+    `process_batch` receives a list of items and must return one result per
+    item, in order. Callers block in submit() until their result is ready.
+    With window_ms=0 nothing waits: requests that arrive while a batch is
+    running simply form the next batch. If a batch raises (or returns the
+    wrong number of results), each item is retried on its own so one bad
+    request only fails its own caller. submit() gives up after
+    `timeout_seconds` rather than wait forever on a stuck batch.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]],
+                 window_ms: float = 2.0, max_batch_size: int = 16,
+                 name: str = "query-batcher", timeout_seconds: float = 30.0):
+        self._process_batch = process_batch
+        self.name = name
+        self.window_seconds = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.timeout_seconds = timeout_seconds
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes: Counter = Counter()
+        self._items = 0
+        self._wait_seconds = 0.0
+        self._fallbacks = 0
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item: Any) -> Any:
+        """Queue one request and block until its batch has been processed.
+
+        Raises concurrent.futures.TimeoutError after `timeout_seconds`.
+        """
+        future: Future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future.result(timeout=self.timeout_seconds)
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._serve(batch)
+            except Exception as e:
+                # Never let the single worker die: later submit()s would hang
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _serve(self, batch: List[tuple]):
+        started = time.perf_counter()
+        with self._lock:
+            self._batch_sizes[len(batch)] += 1
+            self._items += len(batch)
+            self._wait_seconds += sum(started - queued_at for _, _, queued_at in batch)
+        metrics.QUERY_BATCH_SIZE.observe(len(batch), batcher=self.name)
+
+        try:
+            results = self._process_batch([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name}: {len(results)} results for {len(batch)} requests")
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            with self._lock:
+                self._fallbacks += 1
+            metrics.QUERY_BATCH_FALLBACKS.inc(batcher=self.name)
+            for item, future, _ in batch:
+                self._process_one(item, future)
+            return
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def _process_one(self, item: Any, future: Future):
+        try:
+            results = self._process_batch([item])
+            if len(results) != 1:
+                raise RuntimeError(f"{self.name}: {len(results)} results for 1 request")
+            future.set_result(results[0])
+        except Exception as e:
+            future.set_exception(e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            batches = sum(self._batch_sizes.values())
+            return {
+                "window_ms": self.window_seconds * 1000.0,
+                "max_batch_size": self.max_batch_size,
+                "batches": batches,
+                "queries": self._items,
+                "mean_batch_size": round(self._items / batches, 3) if batches else 0.0,
+                "mean_wait_ms": round(self._wait_seconds * 1000.0 / self._items, 3) if self._items else 0.0,
+                "fallbacks": self._fallbacks,
+                "batch_size_histogram": {str(size): count for size, count in sorted(self._batch_sizes.items())},
+            }
@@ -2,43 +2,162 @@
 backend/rag_system.py - SIMPLIFIED without memory modules
 """
 import os
+import json
+import textwrap
 from dotenv import load_dotenv
-from typing import List, Tuple
+from typing import List, Tuple, Optional, Iterator, Callable
 import hashlib
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 
 # Load environment
 load_dotenv()
 
-# SIMPLIFIED IMPORTS - No memory modules!
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_chroma import Chroma
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough, RunnableParallel
-from langchain_core.output_parsers import StrOutputParser
+# LIGHT IMPORTS ONLY - langchain, MiniLM, PyPDF and Chroma are imported on
+# first use so processes serving /api/status or /api/profile start fast
+import metrics
+from semantic_cache import SemanticCache
+from namespaces import NamespaceRegistry, DEFAULT_NAMESPACE
+from query_batcher import QueryBatcher
+
+# Vector store location (shared by ingestion and status reporting); each
+# namespace is its own collection under it, see namespaces.py
+PERSIST_DIRECTORY = "./chroma_db_lukman"
+
+# Retrieval: "similarity" (Chroma only) or "hybrid" (Chroma + BM25, rank-fused)
+RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "similarity")
+RETRIEVAL_K = 3
+HYBRID_CANDIDATES = int(os.getenv("RAG_HYBRID_CANDIDATES", "10"))
+
+# Vector search backend: "chroma" or "compact" (memory-mapped int8/float16
+# matrix built from each Chroma collection; Chroma remains the store of record)
+VECTOR_BACKEND = os.getenv("RAG_VECTOR_BACKEND", "chroma")
+COMPACT_INDEX_DTYPE = os.getenv("RAG_COMPACT_INDEX_DTYPE", "int8")
+
+# Optional second stage: rerank a wider candidate set with a local cross-encoder
+RERANK_ENABLED = os.getenv("RAG_RERANK", "0") == "1"
+RERANK_MODEL = os.getenv("RAG_RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_CANDIDATES = int(os.getenv("RAG_RERANK_CANDIDATES", "20"))
+RERANK_BUDGET_MS = float(os.getenv("RAG_RERANK_BUDGET_MS", "150"))
+
+# Prompt context: merged/deduplicated chunks are packed into this many tokens
+CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "1500"))
+
+# Micro-batching of concurrent queries (RAG_QUERY_BATCHING=1 enables it). Off by
+# default: it only pays off under concurrent load, and a lone query would still
+# hop through the batch worker and wait out the window
+QUERY_BATCHING_ENABLED = os.getenv("RAG_QUERY_BATCHING", "0") == "1"
+QUERY_BATCH_WINDOW_MS = float(os.getenv("RAG_QUERY_BATCH_WINDOW_MS", "2"))
+QUERY_BATCH_MAX_SIZE = int(os.getenv("RAG_QUERY_BATCH_MAX_SIZE", "16"))
+
+# Ingestion pipeline tuning (override per host via environment)
+EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "64"))
+EMBED_WORKERS = int(os.getenv("RAG_EMBED_WORKERS", "2"))
+
+# Embedding backend: "torch" (sentence-transformers) or "onnx" (int8 ONNX Runtime)
+EMBEDDING_BACKEND = os.getenv("RAG_EMBEDDING_BACKEND", "torch")
+ONNX_CACHE_DIR = os.getenv("RAG_ONNX_CACHE_DIR", "./onnx_models")
+ONNX_THREADS = int(os.getenv("RAG_ONNX_THREADS", "0")) or None
+ONNX_QUANTIZE = os.getenv("RAG_ONNX_QUANTIZE", "1") != "0"
+
+# Gemini models in preference order; the last healthy one is cached on disk
+LLM_MODEL_CANDIDATES = [
+    "gemini-2.5-flash",  # Most reliable
+    "gemini-1.5-flash-001",     # Stable
+    "gemini-1.0-pro",           # Fallback
+]
+LLM_MODEL_CACHE_PATH = os.getenv(
+    "RAG_LLM_MODEL_CACHE", os.path.join(PERSIST_DIRECTORY, "llm_model.json")
+)
+LLM_MODEL_CACHE_TTL = float(os.getenv("RAG_LLM_MODEL_CACHE_TTL", "86400"))
+LLM_RETRY_ATTEMPTS = int(os.getenv("RAG_LLM_RETRY_ATTEMPTS", "3"))
+
+# Query-embedding LRU (RAG_QUERY_EMBEDDING_CACHE_PATH enables the on-disk copy)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("RAG_QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+QUERY_EMBEDDING_CACHE_PATH = os.getenv("RAG_QUERY_EMBEDDING_CACHE_PATH") or None
+
+# Semantic answer cache (RAG_ANSWER_CACHE=0 disables it)
+ANSWER_CACHE_ENABLED = os.getenv("RAG_ANSWER_CACHE", "1") != "0"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("RAG_ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_SIZE = int(os.getenv("RAG_ANSWER_CACHE_SIZE", "256"))
+ANSWER_CACHE_TTL = float(os.getenv("RAG_ANSWER_CACHE_TTL", "3600"))
 
 class LukmanRAGSystem:
-    def __init__(self, pdf_path: str = None):
-        """Initialize SIMPLIFIED RAG system - No memory headaches!"""
+    def __init__(self, pdf_path: str = None, embed_batch_size: Optional[int] = None,
+                 embed_workers: Optional[int] = None, retrieval_mode: Optional[str] = None,
+                 llm=None, embeddings=None, persist_directory: Optional[str] = None):
+        """Initialize SIMPLIFIED RAG system - No memory headaches!
+        
+        `llm` / `embeddings` replace Gemini / MiniLM (e.g. offline benchmarks)
+        and `persist_directory` replaces the default vector store location.
+        """
         print("🚀 Initializing Simplified RAG System...")
         
         self.pdf_path = pdf_path
         self.pdf_loaded = False
         self.vector_db_ready = False
         self.llm_connected = False
+        self.llm_model = None
         self.total_chunks = 0
+        self.embed_batch_size = embed_batch_size or EMBED_BATCH_SIZE
+        self.embed_workers = embed_workers or EMBED_WORKERS
+        self.retrieval_mode = retrieval_mode or RETRIEVAL_MODE
+        if self.retrieval_mode not in ("similarity", "hybrid"):
+            raise ValueError(f"❌ Unknown retrieval mode: {self.retrieval_mode}")
+        self.last_ingest_stats = {}
+        self.persist_directory = persist_directory or PERSIST_DIRECTORY
         
         # SIMPLE: In-memory session storage (no external memory modules)
         self.session_data = {}
         
-        # Initialize core components
-        self.embeddings = self._setup_embeddings()
-        self.llm = self._setup_llm()
-        self.vectorstore = None
+        # Core components are built lazily (see the embeddings/llm properties)
+        self._init_lock = threading.RLock()
+        self._embeddings = None
+        self._llm = llm
+        if embeddings is not None:
+            from embedding_cache import CachedQueryEmbeddings
+            
+            self._embeddings = CachedQueryEmbeddings(
+                embeddings, max_entries=QUERY_EMBEDDING_CACHE_SIZE
+            )
+        self.answer_cache = SemanticCache(
+            lambda text: self.embeddings.embed_query(text),
+            threshold=ANSWER_CACHE_THRESHOLD,
+            max_entries=ANSWER_CACHE_SIZE,
+            ttl_seconds=ANSWER_CACHE_TTL
+        ) if ANSWER_CACHE_ENABLED else None
+        self.namespaces = NamespaceRegistry(
+            self.persist_directory, vector_backend=VECTOR_BACKEND, compact_dtype=COMPACT_INDEX_DTYPE
+        )
+        # Concurrent searches share one embedding batch and one Chroma query per namespace
+        self.query_batcher = QueryBatcher(
+            self._search_batch,
+            window_ms=QUERY_BATCH_WINDOW_MS,
+            max_batch_size=QUERY_BATCH_MAX_SIZE
+        ) if QUERY_BATCHING_ENABLED else None
+        if RERANK_ENABLED:
+            from reranker import CrossEncoderReranker
+            
+            self.reranker = CrossEncoderReranker(RERANK_MODEL, latency_budget_ms=RERANK_BUDGET_MS)
+            # Load the cross-encoder off the request path; queries skip reranking until it's ready
+            self.reranker.start_warm_up()
+        else:
+            self.reranker = None
         self.retriever = None
         self.rag_chain = None
+        self.rag_chain_with_sources = None
+        self.answer_chain = None
+        
+        # Set up last: the background model probe may rebuild the chain
+        if llm is None:
+            self._setup_llm()
+        else:
+            self.llm_model = getattr(llm, "model_name", None) or type(llm).__name__
+            self.llm_connected = True
+            print(f"✅ Using provided LLM: {self.llm_model}")
         
         # Load default PDF if provided
         if pdf_path and os.path.exists(pdf_path):
@@ -46,8 +165,49 @@ class LukmanRAGSystem:
         else:
             print("⚠️  No PDF path provided. Use process_pdf() to load one.")
     
+    @property
+    def embeddings(self):
+        """Query-cached local embeddings, loaded on first use"""
+        if self._embeddings is None:
+            with self._init_lock:
+                if self._embeddings is None:
+                    from embedding_cache import CachedQueryEmbeddings
+                    
+                    # Repeated queries skip MiniLM encoding; shared by retriever and answer cache
+                    self._embeddings = CachedQueryEmbeddings(
+                        self._setup_embeddings(),
+                        max_entries=QUERY_EMBEDDING_CACHE_SIZE,
+                        persist_path=QUERY_EMBEDDING_CACHE_PATH
+                    )
+        return self._embeddings
+    
+    @property
+    def llm(self):
+        """Gemini chat model (with retry + fallbacks), built on first use"""
+        if self._llm is None:
+            with self._init_lock:
+                if self._llm is None:
+                    self._llm = self._build_llm(self.llm_model)
+        return self._llm
+    
     def _setup_embeddings(self):
         """Setup local embeddings (free)"""
+        if EMBEDDING_BACKEND == "onnx":
+            try:
+                from onnx_embeddings import OnnxMiniLMEmbeddings
+                
+                embeddings = OnnxMiniLMEmbeddings(
+                    cache_dir=ONNX_CACHE_DIR,
+                    num_threads=ONNX_THREADS,
+                    quantize=ONNX_QUANTIZE
+                )
+                print("✅ Local embeddings ready (all-MiniLM-L6-v2, ONNX Runtime)")
+                return embeddings
+            except Exception as e:
+                print(f"⚠️  ONNX embeddings unavailable ({e}); using PyTorch backend")
+        
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        
         try:
             embeddings = HuggingFaceEmbeddings(
                 model_name="all-MiniLM-L6-v2",
@@ -65,83 +225,330 @@ class LukmanRAGSystem:
             )
     
     def _setup_llm(self):
-        """Setup Gemini LLM"""
+        """Choose the Gemini model without any network calls.
+        
+        Uses the model cached by a previous health probe if it is still
+        fresh; otherwise starts with the first candidate and probes the
+        candidates in a background thread. The model itself is built on
+        first use (see `llm`); real requests retry with backoff and fall
+        back to the next model on failure.
+        """
         api_key = os.getenv("GOOGLE_API_KEY")
         if not api_key:
             raise ValueError("❌ GOOGLE_API_KEY not found in .env file")
+        self._google_api_key = api_key
+        
+        cached_model = self._load_cached_model()
+        if cached_model:
+            self.llm_model = cached_model
+            self.llm_connected = True
+            print(f"✅ Using cached Gemini model: {cached_model}")
+        else:
+            self.llm_model = LLM_MODEL_CANDIDATES[0]
+            print(f"✅ Gemini model selected: {self.llm_model} (health probe in background)")
+            threading.Thread(target=self._probe_models, name="llm-probe", daemon=True).start()
+    
+    def _build_llm(self, preferred_model: str):
+        """Preferred model first, the other candidates as fallbacks, each retried with backoff"""
+        from langchain_google_genai import ChatGoogleGenerativeAI
         
-        # Try different Gemini models
-        model_names = [
-            "gemini-2.5-flash",  # Most reliable
-            "gemini-1.5-flash-001",     # Stable
-            "gemini-1.0-pro",           # Fallback
+        model_names = [preferred_model] + [
+            name for name in LLM_MODEL_CANDIDATES if name != preferred_model
+        ]
+        models = [
+            ChatGoogleGenerativeAI(
+                model=model_name,
+                google_api_key=self._google_api_key,
+                temperature=0.1,  # Low for factual responses
+                max_output_tokens=1024
+            ).with_retry(
+                stop_after_attempt=LLM_RETRY_ATTEMPTS,
+                wait_exponential_jitter=True
+            )
+            for model_name in model_names
         ]
+        return models[0].with_fallbacks(models[1:])
+    
+    @staticmethod
+    def _load_cached_model() -> Optional[str]:
+        try:
+            with open(LLM_MODEL_CACHE_PATH, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get("model") not in LLM_MODEL_CANDIDATES:
+            return None
+        if time.time() - cached.get("checked_at", 0) > LLM_MODEL_CACHE_TTL:
+            return None
+        return cached["model"]
+    
+    @staticmethod
+    def _save_cached_model(model_name: str):
+        directory = os.path.dirname(LLM_MODEL_CACHE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(LLM_MODEL_CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump({"model": model_name, "checked_at": time.time()}, f)
+    
+    def _probe_models(self):
+        """Background health probe: find the first working model and cache it"""
+        from langchain_google_genai import ChatGoogleGenerativeAI
         
-        for model_name in model_names:
-            try:
-                print(f"  Testing model: {model_name}...")
-                llm = ChatGoogleGenerativeAI(
-                    model=model_name,
-                    google_api_key=api_key,
-                    temperature=0.1,  # Low for factual responses
-                    max_output_tokens=1024
-                )
+        for model_name in LLM_MODEL_CANDIDATES:
+            for attempt in range(2):
+                try:
+                    ChatGoogleGenerativeAI(
+                        model=model_name,
+                        google_api_key=self._google_api_key,
+                        max_output_tokens=8
+                    ).invoke("Say 'Hello'")
+                except Exception as e:
+                    print(f"   ❌ LLM probe {model_name} failed: {str(e)[:60]}...")
+                    time.sleep(2 ** attempt)
+                    continue
                 
-                # Quick test
-                test_response = llm.invoke("Say 'Hello'")
-                print(f"✅ Connected to: {model_name}")
-                print(f"   Test: '{test_response.content}'")
+                print(f"✅ LLM probe: {model_name} is healthy")
+                self._save_cached_model(model_name)
                 self.llm_connected = True
-                return llm
-                
-            except Exception as e:
-                error_msg = str(e)
-                print(f"   ❌ {model_name} failed: {error_msg[:60]}...")
-                continue
+                if model_name != self.llm_model:
+                    self._switch_llm(model_name)
+                return
+        
+        print("⚠️  LLM probe: no Gemini model responded; requests will retry and fall back")
+    
+    def _switch_llm(self, model_name: str):
+        """Swap in a new model (and chains using it) without exposing a half-built chain"""
+        llm = self._build_llm(model_name)
+        retriever = self.retriever
+        chains = self._make_chains(llm, retriever) if retriever is not None else None
+        with self._init_lock:
+            if self.retriever is not None and self.retriever is not retriever:
+                chains = self._make_chains(llm, self.retriever)  # chain was built meanwhile
+            self.llm_model, self._llm = model_name, llm
+            if chains:
+                self._set_chains(chains)
+    
+    def _build_retriever(self):
+        """Retriever over every namespace (explicit namespaces: see search())"""
+        from retrievers import KnowledgeRetriever
+        
+        return KnowledgeRetriever(search=self.search, k=RETRIEVAL_K)
+    
+    def _ensure_ready(self):
+        """Build the chain from an existing store (e.g. after a restart)"""
+        if self.rag_chain is None and self.namespaces.names():
+            with self._init_lock:
+                if self.rag_chain is None:
+                    self.retriever = self._build_retriever()
+                    self._build_simple_chain()
+                    self.vector_db_ready = True
+    
+    def search(self, query: str, namespaces: Optional[List[str]] = None,
+               k: int = RETRIEVAL_K) -> List:
+        """Top-k documents for `query` from one or several namespaces.
+        
+        The query is embedded once; each namespace only searches its own
+        collection and the per-namespace results are merged by score.
+        Concurrent calls are coalesced by the query batcher. With a
+        reranker, RERANK_CANDIDATES are fetched and reranked down to k.
+        """
+        names = list(namespaces or self.namespaces.names())
+        unknown = [name for name in names if not self.namespaces.exists(name)]
+        if unknown:
+            raise ValueError(f"❌ Unknown namespace(s): {', '.join(unknown)}")
+        
+        fetch_k = max(k, RERANK_CANDIDATES) if self.reranker else k
+        request = (query, names, fetch_k)
+        if self.query_batcher:
+            docs = self.query_batcher.submit(request)
+        else:
+            docs = self._search_batch([request])[0]
+        
+        if self.reranker:
+            with metrics.span("rerank"):
+                return self.reranker.rerank(query, docs, k)
+        return docs
+    
+    def _search_batch(self, requests: List[tuple]) -> List[List]:
+        """Serve (query, namespaces, k) requests with one embedding batch and
+        one vector query per namespace"""
+        queries = [query for query, _, _ in requests]
+        if hasattr(self.embeddings, "embed_queries"):
+            vectors = self.embeddings.embed_queries(queries)
+        else:
+            vectors = [self.embeddings.embed_query(query) for query in queries]
+        
+        # Which requests target each namespace
+        by_namespace = {}
+        for i, (_, names, _) in enumerate(requests):
+            for name in names:
+                by_namespace.setdefault(name, []).append(i)
+        
+        hits = [[] for _ in requests]
+        for name, indices in by_namespace.items():
+            fetch_k = max(requests[i][2] for i in indices)
+            if self.retrieval_mode == "hybrid":
+                fetch_k = max(fetch_k, HYBRID_CANDIDATES)
+            # Pinned snapshot: a concurrent re-index can't swap the index mid-query
+            with self.namespaces.get(name).acquire() as snapshot:
+                vector_hits = snapshot.vector_search_batch([vectors[i] for i in indices], fetch_k)
+                for i, namespace_hits in zip(indices, vector_hits):
+                    query, _, k = requests[i]
+                    hits[i].extend(self._fuse_namespace_hits(snapshot, query, namespace_hits, k))
+        
+        results = []
+        for (_, _, k), request_hits in zip(requests, hits):
+            request_hits.sort(key=lambda hit: hit[1], reverse=True)
+            results.append([doc for doc, _ in request_hits[:k]])
+        return results
+    
+    def _fuse_namespace_hits(self, snapshot, query: str, vector_hits: List, k: int) -> List:
+        """(doc, score) pairs from one namespace snapshot for the configured retrieval mode"""
+        if self.retrieval_mode == "hybrid":
+            from retrievers import reciprocal_rank_fusion
+            
+            return reciprocal_rank_fusion([
+                vector_hits,
+                snapshot.lexical_search(query, HYBRID_CANDIDATES)
+            ], k)
+        return vector_hits[:k]
+    
+    def list_namespaces(self) -> List[dict]:
+        return self.namespaces.list()
+    
+    def delete_namespace(self, namespace: str):
+        """Remove a namespace and everything ingested into it"""
+        self.namespaces.delete(namespace)
+        self._invalidate_answer_cache()
+        if not self.namespaces.names():
+            self.vector_db_ready = False
+        print(f"✅ Namespace deleted: {namespace}")
+    
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _chunk_id(source_name: str, chunk) -> str:
+        """Deterministic ID: same source + page + text always maps to the same vector"""
+        page = chunk.metadata.get('page', '')
+        key = f"{source_name}\x00{page}\x00{chunk.page_content}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+    
+    def _invalidate_answer_cache(self):
+        """Cached answers may cite chunks that changed - drop them all"""
+        if self.answer_cache:
+            self.answer_cache.invalidate()
+            print("   Answer cache invalidated (corpus changed)")
+    
+    def _iter_chunks(self, pdf_path: str, source_name: str, report) -> Iterator:
+        """Stream chunks page by page so the whole PDF is never held in memory"""
+        from langchain_community.document_loaders import PyPDFLoader
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        
+        loader = PyPDFLoader(pdf_path)
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=1000,
+            chunk_overlap=200,
+            length_function=len,
+            separators=["\n\n", "\n", " ", ""],
+            add_start_index=True  # lets context packing strip the overlap again
+        )
         
-        raise ValueError("❌ Could not connect to any Gemini model. Check API key.")
+        pages = loader.lazy_load()
+        pages_loaded = 0
+        while True:
+            with metrics.span("load"):
+                page = next(pages, None)
+            if page is None:
+                break
+            pages_loaded += 1
+            report(pages_loaded=pages_loaded)
+            with metrics.span("split"):
+                chunks = text_splitter.split_documents([page])
+            for chunk in chunks:
+                chunk.metadata['source'] = source_name
+                chunk.metadata['chunk_id'] = self._chunk_id(source_name, chunk)
+                yield chunk
+    
+    @staticmethod
+    def _chroma_metadata(metadata: dict) -> dict:
+        """Chroma only stores scalar metadata values"""
+        return {
+            key: value for key, value in metadata.items()
+            if isinstance(value, (str, int, float, bool))
+        }
     
-    def process_pdf(self, pdf_path: str) -> int:
-        """Process PDF and create vector store"""
+    def process_pdf(self, pdf_path: str, source_name: Optional[str] = None,
+                    progress: Optional[Callable[[dict], None]] = None,
+                    namespace: str = DEFAULT_NAMESPACE) -> int:
+        """Process PDF and update its namespace's collection incrementally.
+        
+        Chunks get content-hash IDs, so only new or changed chunks are
+        embedded and chunks that disappeared from the PDF are deleted.
+        Loading/splitting, embedding (worker pool, fixed-size batches) and
+        Chroma upserts overlap, with a bounded number of batches in flight.
+        Changes go into a staging copy of the index that replaces the live
+        one in a single swap, so concurrent chats never see a partial index.
+        Building that copy rewrites every stored chunk in the namespace
+        (no re-embedding; see KnowledgeNamespace.stage).
+        `progress` (optional) receives counters as ingestion advances.
+        """
+        def report(**counters):
+            if progress:
+                progress(counters)
+        
         try:
-            print(f"\n📄 Processing PDF: {pdf_path}")
+            print(f"\n📄 Processing PDF: {pdf_path} (namespace: {namespace})")
             
             if not os.path.exists(pdf_path):
                 raise FileNotFoundError(f"PDF not found: {pdf_path}")
             
-            # Load PDF
-            loader = PyPDFLoader(pdf_path)
-            documents = loader.load()
-            print(f"   Loaded {len(documents)} pages")
-            
-            # Split into chunks
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1000,
-                chunk_overlap=200,
-                length_function=len,
-                separators=["\n\n", "\n", " ", ""]
-            )
-            
-            chunks = text_splitter.split_documents(documents)
-            self.total_chunks = len(chunks)
-            print(f"   Created {self.total_chunks} chunks")
+            source_name = source_name or os.path.basename(pdf_path)
+            file_hash = self._file_hash(pdf_path)
             
-            # Create vector store
-            self.vectorstore = Chroma.from_documents(
-                documents=chunks,
-                embedding=self.embeddings,
-                persist_directory="./chroma_db_lukman",
-                collection_name="lukman_knowledge"
-            )
-            
-            # Create retriever
-            self.retriever = self.vectorstore.as_retriever(
-                search_type="similarity",
-                search_kwargs={"k": 3}  # Get top 3 chunks
-            )
+            with self.namespaces.writing(namespace, create=True) as target:
+                manifest_exists = os.path.exists(target.manifest_path)
+                manifest = target.load_manifest()
+                previous = manifest["sources"].get(source_name)
+                
+                if previous and previous["file_hash"] == file_hash:
+                    self.total_chunks = len(previous["chunk_ids"])
+                    print(f"   Unchanged since last ingest ({self.total_chunks} chunks) - skipping")
+                else:
+                    if not manifest_exists and target.count() > 0:
+                        # Collection was built before chunk IDs existed - its random IDs
+                        # can't be matched, so rebuild it once instead of duplicating.
+                        print("   Rebuilding legacy collection (no ingest manifest)")
+                    staging = target.stage(copy_existing=manifest_exists)
+                    try:
+                        stats = self._run_ingest_pipeline(
+                            target, staging, pdf_path, source_name, previous, report
+                        )
+                        # Swap first: a manifest ahead of the index would skip this file forever
+                        target.publish(staging)
+                    except Exception:
+                        target.discard(staging)
+                        raise
+                    
+                    self.total_chunks = len(stats["chunk_ids"])
+                    manifest["sources"][source_name] = {
+                        "file_hash": file_hash,
+                        "chunk_ids": stats.pop("chunk_ids")
+                    }
+                    target.save_manifest(manifest)
+                    self.last_ingest_stats = stats
+                    print(f"   Published {staging.collection_name}")
+                    
+                    if stats["chunks_embedded"] or stats["chunks_removed"]:
+                        self._invalidate_answer_cache()
             
-            # Build SIMPLE RAG chain (no memory)
-            self._build_simple_chain()
+            # Create retriever + SIMPLE RAG chain (no memory) on first ingest
+            self._ensure_ready()
             
             self.pdf_loaded = True
             self.vector_db_ready = True
@@ -153,11 +560,118 @@ class LukmanRAGSystem:
             print(f"❌ PDF processing failed: {e}")
             raise
     
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        with metrics.span("embed"):
+            return self.embeddings.embed_documents(texts)
+    
+    def _run_ingest_pipeline(self, target, staging, pdf_path: str, source_name: str,
+                             previous: Optional[dict], report) -> dict:
+        """Embed and upsert new chunks into `staging`, delete stale ones; returns ingest stats"""
+        old_ids = set(previous["chunk_ids"]) if previous else set()
+        chunk_ids = {}  # insertion-ordered set: identical chunks collapse onto one ID
+        pages = {"loaded": 0}
+        embedded = 0
+        queued = 0
+        started = time.perf_counter()
+        
+        def track(**counters):
+            pages["loaded"] = counters.get("pages_loaded", pages["loaded"])
+            report(**counters)
+        
+        def upsert(batch, future):
+            nonlocal embedded
+            vectors = future.result()
+            ids = [chunk.metadata['chunk_id'] for chunk in batch]
+            texts = [chunk.page_content for chunk in batch]
+            metadatas = [self._chroma_metadata(chunk.metadata) for chunk in batch]
+            with metrics.span("upsert"):
+                staging.collection.upsert(ids=ids, embeddings=vectors, documents=texts, metadatas=metadatas)
+                staging.lexical_index.add(ids, texts, metadatas)
+            embedded += len(batch)
+            metrics.CHUNKS_INGESTED.inc(len(batch), namespace=target.name)
+            elapsed = max(time.perf_counter() - started, 1e-9)
+            report(chunks_embedded=embedded, chunks_per_second=round(embedded / elapsed, 2))
+        
+        # At most two batches per worker are waiting, which bounds memory use
+        max_in_flight = 2 * self.embed_workers
+        in_flight = deque()
+        batch = []
+        
+        with ThreadPoolExecutor(max_workers=self.embed_workers,
+                                thread_name_prefix="embed") as pool:
+            def submit(batch):
+                texts = [chunk.page_content for chunk in batch]
+                in_flight.append((batch, pool.submit(self._embed_batch, texts)))
+                while len(in_flight) >= max_in_flight:
+                    upsert(*in_flight.popleft())
+            
+            for chunk in self._iter_chunks(pdf_path, source_name, track):
+                chunk_id = chunk.metadata['chunk_id']
+                if chunk_id in chunk_ids:
+                    continue
+                chunk_ids[chunk_id] = None
+                if chunk_id in old_ids:
+                    continue
+                
+                batch.append(chunk)
+                queued += 1
+                report(chunks_total=queued)
+                if len(batch) >= self.embed_batch_size:
+                    submit(batch)
+                    batch = []
+            
+            if batch:
+                submit(batch)
+            while in_flight:
+                upsert(*in_flight.popleft())
+        
+        stale_ids = list(old_ids - set(chunk_ids))
+        if stale_ids:
+            staging.collection.delete(ids=stale_ids)
+            staging.lexical_index.remove(stale_ids)
+        
+        elapsed = time.perf_counter() - started
+        stats = {
+            "source": source_name,
+            "namespace": target.name,
+            "pages_loaded": pages["loaded"],
+            "chunks_total": len(chunk_ids),
+            "chunks_embedded": embedded,
+            "chunks_removed": len(stale_ids),
+            "chunks_kept": len(chunk_ids) - embedded,
+            "seconds": round(elapsed, 3),
+            "chunks_per_second": round(embedded / elapsed, 2) if elapsed > 0 else 0.0,
+            "embed_batch_size": self.embed_batch_size,
+            "embed_workers": self.embed_workers,
+            "chunk_ids": list(chunk_ids),
+        }
+        print(f"   Loaded {stats['pages_loaded']} pages, {stats['chunks_total']} chunks")
+        print(f"   Embedded {embedded} new chunks, removed {len(stale_ids)} stale, "
+              f"kept {stats['chunks_kept']} ({stats['chunks_per_second']} chunks/s)")
+        return stats
+    
     def _build_simple_chain(self):
         """Build a SIMPLE RAG chain without memory"""
+        chains = self._make_chains(self.llm, self.retriever)
+        with self._init_lock:
+            self._set_chains(chains)
+        print("✅ Built simple RAG chain (no memory modules needed)")
+    
+    def _set_chains(self, chains: tuple):
+        # One assignment, under _init_lock: readers see the old or the new chains, never a mix
+        self.answer_chain, self.rag_chain_with_sources, self.rag_chain = chains
+    
+    def _make_chains(self, llm, retriever) -> tuple:
+        """(answer_chain, rag_chain_with_sources, rag_chain) for `llm` and `retriever`"""
+        from langchain_core.prompts import ChatPromptTemplate
+        from langchain_core.runnables import RunnablePassthrough, RunnableParallel
+        from langchain_core.output_parsers import StrOutputParser
+        from metrics_callbacks import StageTimingHandler
+        from context_packing import pack_context
         
-        # SIMPLE prompt template - no chat history parameter
-        prompt_template = """
+        # SIMPLE prompt template - no chat history parameter (dedented: the
+        # indentation was sent to Gemini as tokens on every request)
+        prompt_template = textwrap.dedent("""
         You are "Lukwealth Assistant", an AI representing Lukman Adebayo Ibrahim (Lukwealth).
         
         CONTEXT FROM LUKMAN'S KNOWLEDGE BASE:
@@ -179,50 +693,70 @@ class LukmanRAGSystem:
         6. Always invite further questions
         
         ANSWER:
-        """
+        """).strip()
         
         prompt = ChatPromptTemplate.from_template(prompt_template)
         
-        # Format documents function
+        # Merge adjacent chunks, drop the split overlap, fit the token budget
         def format_docs(docs):
-            formatted = []
-            for i, doc in enumerate(docs, 1):
-                source = doc.metadata.get('source', 'PDF')
-                page = doc.metadata.get('page', 'N/A')
-                content = doc.page_content
-                formatted.append(f"[Source {i}: {source}, Page {page}]\n{content}")
-            return "\n\n".join(formatted)
-        
-        # SIMPLE chain - no memory, just retrieval + generation
-        self.rag_chain = (
-            RunnableParallel(
-                context=self.retriever | format_docs,
-                question=RunnablePassthrough()
-            )
+            with metrics.span("format_docs"):
+                context, stats = pack_context(docs, CONTEXT_TOKEN_BUDGET)
+            metrics.CONTEXT_CHARS.inc(stats["raw_chars"], kind="raw")
+            metrics.CONTEXT_CHARS.inc(stats["packed_chars"], kind="packed")
+            metrics.CONTEXT_TOKENS.observe(stats["estimated_tokens"])
+            return context
+        
+        # Generation only: {"docs", "question"} -> answer string; the callback
+        # records the "llm" and "parse" stages for invoke() and stream() alike
+        answer_chain = (
+            RunnablePassthrough.assign(context=lambda x: format_docs(x["docs"]))
             | prompt
-            | self.llm
-            | StrOutputParser()
-        )
+            | llm
+            | StrOutputParser().with_config(run_name="parse")
+        ).with_config(callbacks=[StageTimingHandler({"parse": "parse"})])
         
-        print("✅ Built simple RAG chain (no memory modules needed)")
+        # SIMPLE chain - retrieve ONCE, return the answer with the docs it used
+        rag_chain_with_sources = RunnableParallel(
+            docs=retriever,
+            question=RunnablePassthrough()
+        ).assign(answer=answer_chain)
+        
+        # Answer-only variant (same single retrieval)
+        rag_chain = rag_chain_with_sources | itemgetter("answer")
+        return answer_chain, rag_chain_with_sources, rag_chain
     
-    def get_response(self, question: str, session_id: str = "default") -> Tuple[str, List[str]]:
-        """Get response for a question - SIMPLIFIED"""
+    def get_response(self, question: str, session_id: str = "default",
+                     namespaces: Optional[List[str]] = None) -> Tuple[str, List[str]]:
+        """Get response for a question - SIMPLIFIED
+        
+        `namespaces` limits retrieval to those namespaces (default: all).
+        """
+        self._ensure_ready()
         if not self.rag_chain:
             raise ValueError("❌ RAG system not ready. Please load a PDF first.")
         
         print(f"\n🤔 Processing: '{question[:50]}...'")
         
         try:
-            # Get retrieved documents
-            retrieved_docs = self.retriever.invoke(question)
-            sources = [
-                f"Page {doc.metadata.get('page', 'N/A')}: {doc.page_content[:80]}..."
-                for doc in retrieved_docs
-            ]
+            scope = self._cache_scope(namespaces)
+            request_started = time.perf_counter()
+            cached, query_embedding, cache_generation = self._cache_lookup(question, scope)
+            if cached:
+                print("✅ Answer cache hit")
+                self._record_response("invoke", "hit", request_started)
+                return cached
             
-            # Generate response using SIMPLE chain
-            response = self.rag_chain.invoke(question)
+            started = time.perf_counter()
+            
+            # One retrieval feeds both the prompt and the returned sources
+            with metrics.span("retrieve"):
+                docs = self._retriever_for(namespaces).invoke(question)
+            response = self.answer_chain.invoke({"docs": docs, "question": question})
+            sources = self._format_sources(docs)
+            
+            self._cache_store(question, response, sources, time.perf_counter() - started,
+                              query_embedding, scope, cache_generation)
+            self._record_response("invoke", "miss", request_started)
             
             print(f"✅ Response generated ({len(response)} chars)")
             return response, sources
@@ -231,14 +765,99 @@ class LukmanRAGSystem:
             print(f"❌ Error generating response: {e}")
             return f"Error: {str(e)}", []
     
+    def stream_response(self, question: str, session_id: str = "default",
+                        namespaces: Optional[List[str]] = None) -> Iterator[Tuple[str, object]]:
+        """Stream a response: ("sources", [...]) first, then ("token", text) chunks"""
+        self._ensure_ready()
+        if not self.rag_chain:
+            raise ValueError("❌ RAG system not ready. Please load a PDF first.")
+        
+        print(f"\n🤔 Streaming: '{question[:50]}...'")
+        
+        scope = self._cache_scope(namespaces)
+        request_started = time.perf_counter()
+        cached, query_embedding, cache_generation = self._cache_lookup(question, scope)
+        if cached:
+            print("✅ Answer cache hit")
+            answer, sources = cached
+            yield "sources", sources
+            yield "token", answer
+            self._record_response("stream", "hit", request_started)
+            return
+        
+        started = time.perf_counter()
+        
+        # Sources are known as soon as retrieval finishes - send them first
+        with metrics.span("retrieve"):
+            docs = self._retriever_for(namespaces).invoke(question)
+        sources = self._format_sources(docs)
+        yield "sources", sources
+        
+        tokens = []
+        for token in self.answer_chain.stream({"docs": docs, "question": question}):
+            if token:
+                tokens.append(token)
+                yield "token", token
+        
+        answer = "".join(tokens)
+        self._cache_store(question, answer, sources, time.perf_counter() - started,
+                          query_embedding, scope, cache_generation)
+        self._record_response("stream", "miss", request_started)
+        print(f"✅ Response streamed ({len(answer)} chars)")
+    
+    @staticmethod
+    def _record_response(mode: str, cache: str, started: float):
+        metrics.RESPONSES.inc(mode=mode, cache=cache)
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, mode=mode, cache=cache)
+    
+    def _retriever_for(self, namespaces: Optional[List[str]]):
+        if not namespaces:
+            return self.retriever
+        from retrievers import KnowledgeRetriever
+        
+        return KnowledgeRetriever(search=self.search, namespaces=list(namespaces), k=RETRIEVAL_K)
+    
+    @staticmethod
+    def _cache_scope(namespaces: Optional[List[str]]) -> str:
+        return ",".join(sorted(namespaces)) if namespaces else "*"
+    
+    def _cache_lookup(self, question: str, scope: str):
+        if not self.answer_cache:
+            return None, None, None
+        return self.answer_cache.lookup(question, scope=scope)
+    
+    def _cache_store(self, question: str, answer: str, sources: List[str],
+                     latency_seconds: float, query_embedding=None, scope: str = "*",
+                     generation: Optional[int] = None):
+        # `generation` comes from the lookup: answers built before an invalidation are dropped
+        if self.answer_cache:
+            self.answer_cache.store(question, answer, sources, latency_seconds,
+                                    embedding=query_embedding, scope=scope, generation=generation)
+    
+    @staticmethod
+    def _format_sources(docs) -> List[str]:
+        return [
+            f"Page {doc.metadata.get('page', 'N/A')}: {doc.page_content[:80]}..."
+            for doc in docs
+        ]
+    
     def get_system_status(self):
         """Get system status"""
         return {
             "pdf_loaded": self.pdf_loaded,
             "vector_db_ready": self.vector_db_ready,
             "llm_connected": self.llm_connected,
+            "llm_model": self.llm_model,
             "total_chunks": self.total_chunks,
-            "vector_db_path": "./chroma_db_lukman"
+            "vector_db_path": self.persist_directory,
+            "retrieval_mode": self.retrieval_mode,
+            "vector_backend": self.namespaces.vector_backend,
+            "namespaces": self.namespaces.names(),
+            "last_ingest": self.last_ingest_stats,
+            "answer_cache": self.answer_cache.stats() if self.answer_cache else None,
+            "query_embedding_cache": self._embeddings.stats() if self._embeddings else None,
+            "query_batching": self.query_batcher.stats() if self.query_batcher else None,
+            "reranker": self.reranker.stats() if self.reranker else None
         }
     
     def clear_data(self):
@@ -0,0 +1,167 @@
+"""
+backend/reranker.py - Optional cross-encoder reranking of retrieved candidates
+"""
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from semantic_cache import normalize_query
+
+DEFAULT_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+class CrossEncoderReranker:
+    """Rescore (query, chunk) pairs with a small CPU cross-encoder.
+
+    Scores are memoized by (normalized query, chunk hash), so repeated
+    questions only pay for chunks they haven't seen. If scoring the
+    uncached pairs is expected to exceed `latency_budget_ms` (based on a
+    running average per pair), the reranker skips itself and returns the
+    first-stage order unchanged; the estimate decays on every skip so
+    reranking resumes once the host is less loaded.
+
+    The budget is predictive: a predict() call that has started is not
+    interrupted, so a single call can still overrun it (counted in
+    stats() as `calls_over_budget`). The model loads on a background
+    thread (start_warm_up(), called at startup); until it is ready,
+    requests skip reranking instead of waiting for the load.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, max_entries: int = 8192,
+                 latency_budget_ms: float = 150.0, batch_size: int = 32):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.latency_budget_seconds = latency_budget_ms / 1000.0
+        self.batch_size = batch_size
+        self._model = None
+        self._model_error: Optional[str] = None
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        self._seconds_per_pair: Optional[float] = None  # exponential moving average
+        self._warm_up_started = False
+        self._ready = threading.Event()
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.skipped_warming = 0
+        self.over_budget = 0
+
+    @property
+    def model(self):
+        """sentence-transformers CrossEncoder, loaded on first use (None if unavailable)"""
+        if self._model is None and self._model_error is None:
+            with self._model_lock:
+                if self._model is None and self._model_error is None:
+                    try:
+                        from sentence_transformers import CrossEncoder
+
+                        self._model = CrossEncoder(self.model_name, device="cpu")
+                        print(f"✅ Reranker ready ({self.model_name})")
+                    except Exception as e:
+                        self._model_error = str(e)
+                        print(f"⚠️  Reranker unavailable ({e}); keeping first-stage order")
+        return self._model
+
+    def start_warm_up(self):
+        """Load the model and time one pair on a background thread (idempotent)"""
+        with self._lock:
+            if self._warm_up_started:
+                return
+            self._warm_up_started = True
+        threading.Thread(target=self._warm_up, name="reranker-warmup", daemon=True).start()
+
+    def _warm_up(self):
+        try:
+            if self.model is not None:
+                pairs = [("warm up query", "warm up passage")] * 8
+                self.model.predict(pairs, show_progress_bar=False)  # first call pays one-off setup
+                start = time.perf_counter()
+                self.model.predict(pairs, show_progress_bar=False)
+                with self._lock:
+                    self._seconds_per_pair = (time.perf_counter() - start) / len(pairs)
+        except Exception as e:
+            print(f"⚠️  Reranker warm-up failed: {e}")
+        finally:
+            self._ready.set()
+
+    @staticmethod
+    def _chunk_key(doc) -> str:
+        return doc.metadata.get("chunk_id") or hashlib.sha256(
+            doc.page_content.encode("utf-8")
+        ).hexdigest()
+
+    def rerank(self, query: str, docs: List, k: int) -> List:
+        """Best `k` of `docs` by cross-encoder score (first-stage order on skip)"""
+        if len(docs) <= 1:
+            return docs[:k]
+        query_key = normalize_query(query)
+        keys = [(query_key, self._chunk_key(doc)) for doc in docs]
+
+        if not self._ready.is_set():
+            self.start_warm_up()
+            with self._lock:
+                self.calls += 1
+                self.skipped_warming += 1
+            return docs[:k]
+
+        with self._lock:
+            self.calls += 1
+            scores = {key: self._scores[key] for key in keys if key in self._scores}
+            for key in scores:
+                self._scores.move_to_end(key)
+            missing = [i for i, key in enumerate(keys) if key not in scores]
+            self.hits += len(keys) - len(missing)
+            if missing:
+                estimate = (self._seconds_per_pair or 0.0) * len(missing)
+                if estimate > self.latency_budget_seconds or self.model is None:
+                    self.skipped += 1
+                    if self._seconds_per_pair:
+                        # Let the estimate recover so a transient slowdown doesn't disable reranking
+                        self._seconds_per_pair *= 0.9
+                    return docs[:k]
+                self.misses += len(missing)
+
+        if missing:
+            start = time.perf_counter()
+            predicted = self.model.predict(
+                [(query, docs[i].page_content) for i in missing],
+                batch_size=self.batch_size,
+                show_progress_bar=False
+            )
+            elapsed = time.perf_counter() - start
+            per_pair = elapsed / len(missing)
+
+            with self._lock:
+                self.over_budget += elapsed > self.latency_budget_seconds
+                self._seconds_per_pair = per_pair if self._seconds_per_pair is None \
+                    else 0.8 * self._seconds_per_pair + 0.2 * per_pair
+                for i, score in zip(missing, predicted):
+                    scores[keys[i]] = self._scores[keys[i]] = float(score)
+                while len(self._scores) > self.max_entries:
+                    self._scores.popitem(last=False)
+
+        order = sorted(range(len(docs)), key=lambda i: scores[keys[i]], reverse=True)
+        return [docs[i] for i in order[:k]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "available": self._model_error is None,
+                "ready": self._ready.is_set(),
+                "calls": self.calls,
+                "score_cache_entries": len(self._scores),
+                "score_cache_hits": self.hits,
+                "score_cache_misses": self.misses,
+                "skipped_over_budget": self.skipped,
+                "skipped_warming_up": self.skipped_warming,
+                # Predictive: calls are skipped on the estimate, never cut short
+                "latency_budget_ms": self.latency_budget_seconds * 1000.0,
+                "latency_budget_mode": "predictive",
+                "calls_over_budget": self.over_budget,
+                "ms_per_pair": round(self._seconds_per_pair * 1000.0, 3) if self._seconds_per_pair else None,
+            }
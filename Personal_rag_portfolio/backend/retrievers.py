@@ -0,0 +1,43 @@
+"""
+backend/retrievers.py - Custom LangChain retrievers used by LukmanRAGSystem
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+
+def reciprocal_rank_fusion(ranked_lists: List[List[Tuple[Document, float]]], k: int,
+                           rrf_k: int = 60) -> List[Tuple[Document, float]]:
+    """Fuse several best-first (doc, score) lists; docs are matched by chunk_id.
+
+    Used for hybrid retrieval: exact terms (emails, company or tool names)
+    that embeddings blur still surface through the BM25 list.
+    """
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+    for ranked in ranked_lists:
+        for rank, (doc, _) in enumerate(ranked):
+            key = doc.metadata.get("chunk_id") or doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank + 1)
+            documents.setdefault(key, doc)
+    ranked_keys = sorted(documents, key=lambda key: scores[key], reverse=True)
+    return [(documents[key], scores[key]) for key in ranked_keys[:k]]
+
+
+class KnowledgeRetriever(BaseRetriever):
+    """Retriever over one or more namespaces (None = every namespace).
+
+    `search` is LukmanRAGSystem.search, which embeds the query once and
+    merges the per-namespace top-k.
+    """
+
+    search: Callable[..., List[Document]]
+    namespaces: Optional[List[str]] = None
+    k: int = 3
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.search(query, namespaces=self.namespaces, k=self.k)
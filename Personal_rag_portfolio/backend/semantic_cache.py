@@ -0,0 +1,146 @@
+"""
+backend/semantic_cache.py - Semantic answer cache for repeated questions
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+
+def normalize_query(text: str) -> str:
+    """Collapse case and whitespace so trivial variations share one key"""
+    return " ".join(text.lower().split())
+
+
+class SemanticCache:
+    """LRU + TTL cache of answers keyed on the normalized query embedding.
+
+    A lookup hits when a cached question's embedding has cosine similarity
+    >= `threshold` with the new question (embeddings are L2-normalized, so
+    this is a dot product). Exact repeats are matched without embedding.
+    `scope` separates answers that came from different corpora (namespaces).
+
+    Every invalidate() bumps `generation`. lookup() hands out the current
+    one and store() drops the answer if the corpus changed in between, so
+    a request that retrieved from the old index can't cache its answer.
+    """
+
+    def __init__(self, embed_query: Callable[[str], List[float]], threshold: float = 0.95,
+                 max_entries: int = 256, ttl_seconds: float = 3600):
+        self._embed_query = embed_query
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_stores = 0
+        self.generation = 0
+        self.latency_saved_seconds = 0.0
+
+    def _embed(self, key: str):
+        import numpy as np
+
+        vector = np.asarray(self._embed_query(key), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _expire(self, now: float):
+        expired = [
+            key for key, entry in self._entries.items()
+            if now - entry["created_at"] > self.ttl_seconds
+        ]
+        for key in expired:
+            del self._entries[key]
+
+    def lookup(self, question: str,
+               scope: str = "") -> Tuple[Optional[Tuple[str, List[str]]], Optional[object], int]:
+        """Return ((answer, sources) or None, query embedding and generation for a later store())"""
+        import numpy as np
+
+        text = normalize_query(question)
+        key = f"{scope}\x00{text}"
+        embedding = None
+
+        with self._lock:
+            generation = self.generation
+            self._expire(time.time())
+            matched_key = key if key in self._entries else None
+            candidates = None if matched_key else [
+                (cached_key, cached["embedding"]) for cached_key, cached in self._entries.items()
+                if cached["scope"] == scope
+            ]
+
+        if matched_key is None and candidates:
+            embedding = self._embed(text)
+            matrix = np.vstack([vector for _, vector in candidates])
+            scores = matrix @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                matched_key = candidates[best][0]
+
+        with self._lock:
+            # Re-read: the entry may have been evicted, invalidated or re-stored
+            # for a newer corpus while the lock was released for embedding
+            entry = self._entries.get(matched_key) if matched_key else None
+            if entry is None or self.generation != generation:
+                self.misses += 1
+                return None, embedding, generation
+            self._entries.move_to_end(matched_key)
+            self.hits += 1
+            self.latency_saved_seconds += entry["latency_seconds"]
+            return (entry["answer"], list(entry["sources"])), embedding, generation
+
+    def store(self, question: str, answer: str, sources: List[str], latency_seconds: float,
+              embedding=None, scope: str = "", generation: Optional[int] = None):
+        """Cache an answer; `latency_seconds` is what a future hit saves.
+
+        Pass the `generation` lookup() returned: if the cache was invalidated
+        since, the answer came from a stale corpus and is not stored.
+        """
+        text = normalize_query(question)
+        key = f"{scope}\x00{text}"
+        if embedding is None:
+            embedding = self._embed(text)
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                self.stale_stores += 1
+                return
+            self._entries[key] = {
+                "key": key,
+                "scope": scope,
+                "embedding": embedding,
+                "answer": answer,
+                "sources": list(sources),
+                "latency_seconds": latency_seconds,
+                "created_at": time.time(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Drop every entry - called when the corpus changes"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+            self.generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "latency_saved_seconds": round(self.latency_saved_seconds, 3),
+                "invalidations": self.invalidations,
+                "stale_stores_dropped": self.stale_stores,
+                "threshold": self.threshold,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
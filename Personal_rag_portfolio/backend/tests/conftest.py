@@ -0,0 +1,7 @@
+"""
+backend/tests/conftest.py - Make backend modules importable as they are in main.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,22 @@
+"""
+backend/tests/test_compact_index.py - Compact index search leaves caller data alone
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from compact_index import CompactVectorIndex
+
+
+def test_search_does_not_normalize_caller_vectors():
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(8, 16)).astype(np.float32)
+    index = CompactVectorIndex.build([f"c{i}" for i in range(8)], embeddings,
+                                     [f"doc {i}" for i in range(8)], [{}] * 8)
+    queries = (embeddings[:2] * 3.0).astype(np.float32)  # e.g. cached query embeddings
+    before = queries.copy()
+
+    hits = index.search_ids(queries, 1)
+
+    np.testing.assert_array_equal(queries, before)
+    assert [hit[0][0] for hit in hits] == [0, 1]
@@ -0,0 +1,74 @@
+"""
+backend/tests/test_context_packing.py - Overlap removal when merging retrieved chunks
+"""
+import random
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.documents import Document
+
+from context_packing import merge_chunks, pack_context
+
+CHUNK_SIZE = 1000
+OVERLAP = 200
+
+
+def page_text(length=2600, seed=7):
+    rng = random.Random(seed)
+    words = ["python", "fastapi", "react", "design", "shipped", "platform", "team", "data"]
+    text = ""
+    while len(text) < length:
+        text += rng.choice(words) + " "
+    return text[:length]
+
+
+def split(text, with_offsets):
+    """Fixed-size chunks with OVERLAP characters repeated between neighbours"""
+    docs, start = [], 0
+    while start < len(text):
+        metadata = {"source": "kb.pdf", "page": 1}
+        if with_offsets:
+            metadata["start_index"] = start
+        docs.append(Document(page_content=text[start:start + CHUNK_SIZE], metadata=metadata))
+        if start + CHUNK_SIZE >= len(text):
+            break
+        start += CHUNK_SIZE - OVERLAP
+    return docs
+
+
+@pytest.mark.parametrize("with_offsets", [True, False])
+@pytest.mark.parametrize("order", [[0, 1, 2], [1, 0, 2], [2, 0, 1], [2, 1, 0]])
+def test_adjacent_chunks_merge_in_any_rank_order(with_offsets, order):
+    text = page_text()
+    chunks = split(text, with_offsets)
+    assert len(chunks) == 3
+
+    passages = merge_chunks([chunks[i] for i in order])
+
+    assert len(passages) == 1
+    assert passages[0].text == text
+    assert passages[0].rank == 0
+
+
+def test_packing_removes_overlap_for_chunks_without_offsets():
+    text = page_text()
+    chunks = split(text, with_offsets=False)
+    ranked = [chunks[1], chunks[0], chunks[2]]
+
+    context, stats = pack_context(ranked, max_tokens=10_000)
+
+    assert stats["passages"] == 1
+    assert stats["packed_chars"] < stats["raw_chars"]
+    assert text in context
+
+
+def test_unrelated_chunks_stay_separate():
+    first = Document(page_content=page_text(500, seed=1), metadata={"source": "kb.pdf", "page": 1})
+    second = Document(page_content=page_text(500, seed=2), metadata={"source": "kb.pdf", "page": 1})
+    other_page = Document(page_content=first.page_content, metadata={"source": "kb.pdf", "page": 2})
+
+    passages = merge_chunks([first, second, other_page])
+
+    assert [passage.rank for passage in passages] == [0, 1, 2]
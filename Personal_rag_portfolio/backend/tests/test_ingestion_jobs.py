@@ -0,0 +1,25 @@
+"""
+backend/tests/test_ingestion_jobs.py - Job status reporting
+"""
+from ingestion_jobs import IngestionJobQueue
+
+
+class FakeRAG:
+    def process_pdf(self, pdf_path, source_name=None, namespace=None, progress=None):
+        progress({"pages_loaded": 2, "chunks_total": 40, "chunks_embedded": 40,
+                  "chunks_per_second": 1234.5})
+        return 40
+
+
+def test_status_keeps_pipeline_throughput(tmp_path):
+    jobs = IngestionJobQueue(lambda: FakeRAG())
+    job = jobs.submit(str(tmp_path / "cv.pdf"), "cv.pdf", "knowledge")
+    jobs._queue.join()
+
+    started = jobs.get(job["job_id"])["started_at"]
+    jobs._update(job["job_id"], finished_at=started + 4.0)
+
+    status = jobs.get(job["job_id"])
+    assert status["state"] == "completed"
+    assert status["chunks_per_second"] == 1234.5
+    assert status["end_to_end_chunks_per_second"] == 10.0
@@ -0,0 +1,180 @@
+"""
+backend/tests/test_main.py - API stays responsive while RAG work is blocked
+"""
+import time
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+
+import main
+
+# Generous bound for a CI box; a blocked event loop would wait for `release`
+PROMPT_SECONDS = 1.0
+
+
+class BlockingRAG:
+    """Stands in for LukmanRAGSystem: answering and ingesting wait on `release`"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.answering = threading.Event()
+        self.ingesting = threading.Event()
+
+    def get_response(self, question, namespaces=None):
+        self.answering.set()
+        self.release.wait(10)
+        return "answer", ["Page 1: ..."]
+
+    def process_pdf(self, pdf_path, source_name=None, namespace=None, progress=None):
+        self.ingesting.set()
+        self.release.wait(10)
+        return 1
+
+    def get_system_status(self):
+        return {"pdf_loaded": True, "vector_db_ready": True, "llm_connected": True,
+                "total_chunks": 1}
+
+
+@pytest.fixture
+def rag(monkeypatch, tmp_path):
+    fake = BlockingRAG()
+    monkeypatch.setattr(main, "rag_system", fake)
+    monkeypatch.setattr(main, "UPLOAD_SPOOL_DIR", str(tmp_path))
+    yield fake
+    fake.release.set()
+
+
+def test_status_and_health_respond_while_chat_and_ingest_block(rag):
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            chat = asyncio.create_task(client.post("/api/chat", json={"message": "hi"}))
+            upload = await client.post(
+                "/api/upload-pdf", files={"file": ("cv.pdf", b"%PDF-1.4 test", "application/pdf")}
+            )
+            assert upload.status_code == 202
+
+            # Both blocking calls are now parked on worker threads
+            assert await asyncio.to_thread(rag.answering.wait, 5)
+            assert await asyncio.to_thread(rag.ingesting.wait, 5)
+
+            start = time.perf_counter()
+            status, health = await asyncio.gather(client.get("/api/status"),
+                                                  client.get("/api/health"))
+            elapsed = time.perf_counter() - start
+
+            assert status.status_code == 200 and status.json()["status"] == "online"
+            assert health.status_code == 200 and health.json() == {"status": "ok"}
+            assert elapsed < PROMPT_SECONDS
+            assert not chat.done()
+
+            rag.release.set()
+            response = await chat
+            assert response.status_code == 200
+            assert response.json()["response"] == "answer"
+
+    asyncio.run(scenario())
+
+
+class StreamingRAG:
+    """stream_response yields tokens until closed; records that it was closed"""
+
+    def __init__(self):
+        self.closed = threading.Event()
+        self.closed_on = None
+        self.streams = []  # keeps the generators alive, so only close() can finish them
+
+    def _events(self):
+        try:
+            yield "sources", ["Page 1: ..."]
+            while True:
+                yield "token", "word "
+        finally:
+            self.closed_on = threading.current_thread()
+            self.closed.set()
+
+    def stream_response(self, question, namespaces=None):
+        self.streams.append(self._events())
+        return self.streams[-1]
+
+
+def test_stream_is_closed_when_client_disconnects(monkeypatch):
+    rag = StreamingRAG()
+    monkeypatch.setattr(main, "rag_system", rag)
+
+    async def scenario():
+        response = await main.chat_stream(main.ChatMessage(message="hi"))
+        body = response.body_iterator
+        assert "sources" in await body.__anext__()
+        assert "token" in await body.__anext__()
+        # What Starlette does when the client goes away mid-stream
+        await body.aclose()
+
+    asyncio.run(scenario())
+    assert rag.closed.wait(1)
+    assert rag.closed_on is not threading.main_thread()  # closed on the worker pool
+
+
+class SlowStreamRAG:
+    """Sends sources, then waits on `release` before every token (a slow LLM)"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def stream_response(self, question, namespaces=None):
+        yield "sources", ["Page 1: ..."]
+        self.release.wait(10)
+        yield "token", "done"
+
+
+def test_slow_streams_do_not_starve_the_rag_pool(monkeypatch):
+    rag = SlowStreamRAG()
+    monkeypatch.setattr(main, "rag_system", rag)
+
+    async def scenario():
+        bodies, pulls = [], []
+        for _ in range(main.RAG_WORKERS):
+            body = (await main.chat_stream(main.ChatMessage(message="hi"))).body_iterator
+            assert "sources" in await body.__anext__()
+            bodies.append(body)
+            pulls.append(asyncio.ensure_future(body.__anext__()))  # parked on the next token
+        await asyncio.sleep(0.1)
+
+        try:
+            assert await asyncio.wait_for(main.run_blocking(lambda: "ok"), PROMPT_SECONDS) == "ok"
+        finally:
+            rag.release.set()
+            await asyncio.gather(*pulls)
+            for body in bodies:
+                await body.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_deleting_a_missing_namespace_is_404(monkeypatch, tmp_path):
+    pytest.importorskip("chromadb")
+    from namespaces import NamespaceRegistry
+
+    class NamespaceRAG:
+        namespaces = NamespaceRegistry(str(tmp_path / "store"))
+
+        def delete_namespace(self, name):
+            self.namespaces.delete(name)
+
+    rag = NamespaceRAG()
+    rag.namespaces.get("docs", create=True)
+    monkeypatch.setattr(main, "rag_system", rag)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Two concurrent deletes: one wins, the other finds nothing to delete
+            first, second = await asyncio.gather(client.delete("/api/namespaces/docs"),
+                                                 client.delete("/api/namespaces/docs"))
+            assert sorted([first.status_code, second.status_code]) == [200, 404]
+
+    asyncio.run(scenario())
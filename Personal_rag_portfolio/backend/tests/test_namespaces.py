@@ -0,0 +1,99 @@
+"""
+backend/tests/test_namespaces.py - Deleting namespaces while they are ingested or read
+"""
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from namespaces import NamespaceRegistry
+
+
+def ingest(namespace, text):
+    """Stage one chunk and publish it, the way process_pdf does"""
+    staging = namespace.stage(copy_existing=False)
+    staging.collection.upsert(ids=[text], embeddings=[[1.0, 0.0, 0.0]], documents=[text])
+    namespace.publish(staging)
+
+
+def collection_names(registry):
+    return {getattr(c, "name", c) for c in registry.client.list_collections()}
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return NamespaceRegistry(str(tmp_path / "store"))
+
+
+def test_delete_waits_for_running_ingest(registry):
+    started, finish = threading.Event(), threading.Event()
+
+    def slow_ingest():
+        with registry.writing("docs", create=True) as namespace:
+            started.set()
+            finish.wait(5)
+            ingest(namespace, "cv")
+
+    writer = threading.Thread(target=slow_ingest)
+    writer.start()
+    assert started.wait(5)
+
+    deleter = threading.Thread(target=registry.delete, args=("docs",))
+    deleter.start()
+    deleter.join(0.2)
+    assert deleter.is_alive()  # blocked on the write lock
+
+    finish.set()
+    writer.join(5)
+    deleter.join(5)
+    assert not registry.exists("docs")
+    assert not any(name.startswith("lukman_docs") for name in collection_names(registry))
+
+
+def test_publish_into_deleted_namespace_fails_cleanly(registry):
+    namespace = registry.get("docs", create=True)
+    staging = namespace.stage(copy_existing=False)
+    registry.delete("docs")
+
+    with pytest.raises(ValueError):
+        namespace.publish(staging)
+    namespace.discard(staging)
+    assert staging.collection_name not in collection_names(registry)
+
+
+def test_recreated_namespace_survives_deferred_drop(registry):
+    ingest(registry.get("docs", create=True), "old")
+    old = registry.get("docs")
+
+    with old.acquire() as pinned:
+        registry.delete("docs")
+        recreated = registry.get("docs", create=True)
+        ingest(recreated, "new")
+        assert pinned.collection_name in collection_names(registry)  # still being read
+        assert recreated.collection_name != pinned.collection_name
+
+    # Releasing the last reader drops the old generation, not the new one
+    assert pinned.collection_name not in collection_names(registry)
+    assert recreated.collection_name in collection_names(registry)
+    assert recreated.count() == 1
+    with recreated.acquire() as snapshot:
+        assert snapshot.collection.get()["documents"] == ["new"]
+
+
+def test_recreation_keeps_compact_files_of_draining_snapshot(tmp_path):
+    pytest.importorskip("numpy")
+    registry = NamespaceRegistry(str(tmp_path / "store"), vector_backend="compact",
+                                 compact_dtype="float16")
+    ingest(registry.get("knowledge", create=True), "old")
+
+    with registry.get("knowledge").acquire() as pinned:
+        pinned.compact_index()
+        registry.delete("knowledge")
+        registry.get("knowledge", create=True)
+        # The default namespace's directory survives deletion, so cleanup must skip these
+        assert os.path.exists(pinned.compact_prefix + ".npy")
+        assert os.path.exists(pinned.compact_prefix + ".json")
+
+    assert not os.path.exists(pinned.compact_prefix + ".npy")
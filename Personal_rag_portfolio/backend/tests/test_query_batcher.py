@@ -0,0 +1,74 @@
+"""
+backend/tests/test_query_batcher.py - Micro-batching, failure isolation and metrics
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from query_batcher import QueryBatcher
+
+
+def submit_together(batcher, items):
+    """Submit all items at once; returns (item, result or exception) pairs"""
+    barrier = threading.Barrier(len(items))
+
+    def call(item):
+        barrier.wait()
+        try:
+            return item, batcher.submit(item)
+        except Exception as e:
+            return item, e
+
+    with ThreadPoolExecutor(max_workers=len(items)) as pool:
+        return list(pool.map(call, items))
+
+
+def test_failing_request_only_fails_its_own_caller():
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        if "bad" in items:
+            raise ValueError("bad query")
+        return [item.upper() for item in items]
+
+    batcher = QueryBatcher(process, window_ms=200, max_batch_size=3, name="test-isolation")
+    results = dict(submit_together(batcher, ["a", "bad", "c"]))
+
+    assert results["a"] == "A" and results["c"] == "C"
+    assert isinstance(results["bad"], ValueError)
+    assert len(calls[0]) == 3  # tried as one batch first
+    assert batcher.stats()["fallbacks"] == 1
+
+
+def test_batch_sizes_are_exported():
+    batcher = QueryBatcher(lambda items: list(items), window_ms=200, max_batch_size=4,
+                           name="test-export")
+    submit_together(batcher, [1, 2, 3, 4])
+
+    assert batcher.stats()["batch_size_histogram"] == {"4": 1}
+    assert metrics.QUERY_BATCH_SIZE.snapshot()[("test-export",)] == {"count": 1, "sum": 4.0}
+    assert 'rag_query_batch_size_bucket{batcher="test-export",le="4"} 1' in metrics.REGISTRY.render()
+
+
+def test_short_result_list_fails_callers_instead_of_hanging():
+    batcher = QueryBatcher(lambda items: list(items)[:-1], window_ms=200, max_batch_size=3,
+                           name="test-short", timeout_seconds=5)
+    results = dict(submit_together(batcher, ["a", "b", "c"]))
+
+    assert all(isinstance(result, RuntimeError) for result in results.values())
+
+
+def test_worker_survives_unexpected_errors(monkeypatch):
+    batcher = QueryBatcher(lambda items: list(items), window_ms=0, name="test-survive",
+                           timeout_seconds=5)
+
+    def broken_observe(*args, **kwargs):
+        raise ValueError("metrics backend down")
+
+    monkeypatch.setattr(metrics.QUERY_BATCH_SIZE, "observe", broken_observe)
+    results = dict(submit_together(batcher, ["a"]))
+    assert isinstance(results["a"], ValueError)
+
+    monkeypatch.undo()
+    assert batcher.submit("b") == "b"
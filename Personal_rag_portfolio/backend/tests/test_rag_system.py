@@ -0,0 +1,69 @@
+"""
+backend/tests/test_rag_system.py - LukmanRAGSystem answering paths, offline
+
+Uses the benchmark fakes (no Gemini, no MiniLM) and replaces search()
+with a counter, so no vector store is needed.
+"""
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.documents import Document
+
+import rag_system
+from benchmarks.fakes import FakeChatModel, HashingEmbeddings
+
+
+@pytest.fixture
+def rag(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag_system, "ANSWER_CACHE_ENABLED", False)
+    system = rag_system.LukmanRAGSystem(
+        llm=FakeChatModel(latency_seconds=0.0),
+        embeddings=HashingEmbeddings(),
+        persist_directory=str(tmp_path / "store")
+    )
+    system.search_calls = []
+
+    def counting_search(query, namespaces=None, k=rag_system.RETRIEVAL_K):
+        system.search_calls.append(query)
+        return [
+            Document(page_content=f"Lukman built project {i} with FastAPI.",
+                     metadata={"page": i, "source": "kb.pdf", "chunk_id": f"c{i}"})
+            for i in range(k)
+        ]
+
+    # search() is looked up on the instance when the retriever is built
+    system.search = counting_search
+    system.retriever = system._build_retriever()
+    system._build_simple_chain()
+    return system
+
+
+def test_get_response_retrieves_once(rag):
+    answer, sources = rag.get_response("What did Lukman build?")
+
+    assert rag.search_calls == ["What did Lukman build?"]
+    assert answer and not answer.startswith("Error")
+    assert len(sources) == rag_system.RETRIEVAL_K
+
+
+def test_stream_response_retrieves_once(rag):
+    events = list(rag.stream_response("What did Lukman build?"))
+
+    assert rag.search_calls == ["What did Lukman build?"]
+    assert events[0][0] == "sources" and len(events[0][1]) == rag_system.RETRIEVAL_K
+    assert any(kind == "token" for kind, _ in events[1:])
+
+
+def test_switching_llm_swaps_model_and_chains_together(rag):
+    new_llm = FakeChatModel(latency_seconds=0.0, answer_words=3)
+    rag._build_llm = lambda model_name: new_llm
+    old_chains = (rag.answer_chain, rag.rag_chain_with_sources, rag.rag_chain)
+
+    rag._switch_llm("gemini-probe-winner")
+
+    assert rag.llm_model == "gemini-probe-winner" and rag.llm is new_llm
+    assert all(new is not old for new, old in
+               zip((rag.answer_chain, rag.rag_chain_with_sources, rag.rag_chain), old_chains))
+    answer, _ = rag.get_response("What did Lukman build?")
+    assert len(answer.split()) == 4  # digest tag + 3 words from the new model
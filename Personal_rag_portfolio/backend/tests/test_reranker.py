@@ -0,0 +1,64 @@
+"""
+backend/tests/test_reranker.py - Warm-up, predictive budget and stats
+"""
+import time
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.documents import Document
+
+from reranker import CrossEncoderReranker
+
+
+class FakeCrossEncoder:
+    """Scores a pair by passage length; sleeps `seconds_per_pair` per pair"""
+
+    def __init__(self, seconds_per_pair=0.0):
+        self.seconds_per_pair = seconds_per_pair
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        time.sleep(self.seconds_per_pair * len(pairs))
+        return [float(len(passage)) for _, passage in pairs]
+
+
+def docs(count):
+    return [Document(page_content="x" * (i + 1), metadata={"chunk_id": f"c{i}"})
+            for i in range(count)]
+
+
+def ready_reranker(model, budget_ms=150.0):
+    reranker = CrossEncoderReranker(latency_budget_ms=budget_ms)
+    reranker._model = model
+    reranker.start_warm_up()
+    assert reranker._ready.wait(5)
+    return reranker
+
+
+def test_skips_until_warm_then_reranks():
+    reranker = CrossEncoderReranker()
+    reranker._model = FakeCrossEncoder(seconds_per_pair=0.05)  # "loading" takes a while
+    candidates = docs(4)
+
+    assert reranker.rerank("q", candidates, 2) == candidates[:2]
+    assert reranker.stats()["skipped_warming_up"] == 1
+
+    assert reranker._ready.wait(5)
+    reranker._seconds_per_pair = 0.0
+    reranker._model.seconds_per_pair = 0.0
+    assert reranker.rerank("q", candidates, 2) == [candidates[3], candidates[2]]
+
+
+def test_budget_is_predictive_and_overruns_are_counted():
+    reranker = ready_reranker(FakeCrossEncoder(seconds_per_pair=0.0), budget_ms=5)
+    reranker._model.seconds_per_pair = 0.01  # host got slower after the estimate was made
+
+    reranker.rerank("q", docs(4), 2)
+    stats = reranker.stats()
+    assert stats["latency_budget_mode"] == "predictive"
+    assert stats["calls_over_budget"] == 1
+
+    # The estimate now exceeds the budget, so the next query skips
+    reranker.rerank("another q", docs(4), 2)
+    assert reranker.stats()["skipped_over_budget"] == 1
@@ -0,0 +1,56 @@
+"""
+backend/tests/test_semantic_cache.py - Answer cache invalidation
+"""
+import pytest
+
+pytest.importorskip("numpy")
+
+from semantic_cache import SemanticCache
+
+
+def fake_embed(text):
+    return [1.0, float(len(text)), 0.5]
+
+
+def test_store_after_invalidate_is_dropped():
+    cache = SemanticCache(fake_embed)
+    cached, embedding, generation = cache.lookup("What did Lukman build?")
+    assert cached is None
+
+    cache.invalidate()  # corpus changed while the request was answering
+    cache.store("What did Lukman build?", "old answer", [], 1.0, embedding, generation=generation)
+
+    assert cache.lookup("What did Lukman build?")[0] is None
+    assert cache.stats()["stale_stores_dropped"] == 1
+
+
+def test_store_without_invalidate_is_kept():
+    cache = SemanticCache(fake_embed)
+    _, embedding, generation = cache.lookup("What did Lukman build?")
+    cache.store("What did Lukman build?", "answer", ["Page 1"], 1.0, embedding, generation=generation)
+
+    cached, _, _ = cache.lookup("what did lukman  build?")
+    assert cached == ("answer", ["Page 1"])
+
+
+def test_invalidate_during_lookup_is_a_miss():
+    cache = SemanticCache(fake_embed)
+    _, embedding, generation = cache.lookup("What did Lukman build?")
+    cache.store("What did Lukman build?", "old answer", [], 1.0, embedding, generation=generation)
+
+    embed = cache._embed
+
+    def embed_then_reingest(text):
+        vector = embed(text)
+        # Corpus changes while the lock is released; the same question is re-answered
+        cache.invalidate()
+        cache.store("What did Lukman build?", "new answer", [], 1.0, vector)
+        return vector
+
+    cache._embed = embed_then_reingest
+    # Not an exact repeat, so the lookup embeds and scores outside the lock
+    cached, _, generation = cache.lookup("What did Lukman build")
+
+    assert cached is None
+    assert generation == 0 and cache.generation == 1
+    assert cache.stats()["misses"] == 2
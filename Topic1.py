@@ -1,41 +1,174 @@
 from langgraph.graph import START, END, StateGraph, MessagesState
 from langgraph.checkpoint.memory import MemorySaver
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, SystemMessage, RemoveMessage
+from langchain_core.runnables import RunnableLambda
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from bounded_checkpointer import BoundedSqliteSaver
+from conversation_summary import SUMMARY_PROMPT, SummaryStats, estimate_tokens, split_for_summary, summary_request
 import os
+import time
 
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
 
-if not openai_api_key:
-    raise ValueError("OPENAI_API_KEY not found! Please set it in your .env file.")
 
-llm = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0.7,
-    api_key=openai_api_key
-)
+def create_llm():
+    """ChatOpenAI, or the offline fake when SUPPORT_LLM=fake"""
+    if os.getenv("SUPPORT_LLM", "openai").lower() == "fake":
+        from fake_chat_model import FakeChatOpenAI
+
+        return FakeChatOpenAI(latency_seconds=float(os.getenv("SUPPORT_FAKE_LATENCY_MS", "300")) / 1000)
+
+    if not openai_api_key:
+        raise ValueError("OPENAI_API_KEY not found! Please set it in your .env file.")
+
+    return ChatOpenAI(
+        model="gpt-4o-mini",
+        temperature=0.7,
+        api_key=openai_api_key
+    )
+
+
+def create_checkpointer():
+    """Conversation state: durable SQLite store by default, SUPPORT_CHECKPOINTER=memory for the old in-RAM saver"""
+    if os.getenv("SUPPORT_CHECKPOINTER", "sqlite").lower() == "memory":
+        return MemorySaver()
+    idle_ttl_hours = float(os.getenv("SUPPORT_THREAD_IDLE_TTL_HOURS", "720"))
+    checkpointer = BoundedSqliteSaver(
+        path=os.getenv("SUPPORT_CHECKPOINT_DB", "support_checkpoints.sqlite"),
+        message_window=int(os.getenv("SUPPORT_MESSAGE_WINDOW", "40")) or None,
+        keep_checkpoints=int(os.getenv("SUPPORT_KEEP_CHECKPOINTS", "2")),
+        idle_ttl_seconds=idle_ttl_hours * 3600 if idle_ttl_hours > 0 else None,
+    )
+    checkpointer.evict_idle()
+    return checkpointer
+
 
 sys_msg = SystemMessage(
     content="You are a helpful customer support representative for an electronics store. Be friendly, professional, and try to solve the customer's issues. Ask clarifying questions when needed."
 )
 
-def customer_support_agent(state: MessagesState) -> dict:
-    messages = [sys_msg] + state["messages"]
-    response = llm.invoke(messages)
-    return {"messages": [AIMessage(content=response.content)]}
 
-builder = StateGraph(MessagesState)
-builder.add_node("customer_support", customer_support_agent)
-builder.add_edge(START, "customer_support")
-builder.add_edge("customer_support", END)
+# Rolling summary: once a thread's prompt passes this many (estimated) tokens, older
+# turns are folded into a summary; 0 disables it. Keep SUPPORT_MESSAGE_WINDOW large
+# enough that the checkpointer's hard cap doesn't drop turns before they're summarized.
+SUMMARY_TRIGGER_TOKENS = int(os.getenv("SUPPORT_SUMMARY_TRIGGER_TOKENS", "0"))
+SUMMARY_KEEP_MESSAGES = int(os.getenv("SUPPORT_SUMMARY_KEEP_MESSAGES", "6"))
+
+
+class SupportState(MessagesState):
+    summary: str
+
+
+def build_prompt(state: SupportState) -> list:
+    summary = state.get("summary", "")
+    if summary:
+        return [sys_msg, SystemMessage(content=f"Summary of the earlier conversation: {summary}")] + state["messages"]
+    return [sys_msg] + state["messages"]
+
+
+def build_support_agent(chat_model, checkpointer, summary_stats=None):
+    """Compile the support graph around any chat model and checkpointer.
+
+    The nodes have sync and async bodies, so `ainvoke` awaits the model
+    directly instead of parking each conversation on an executor thread.
+    Passing `config` through lets stream_mode="messages" see the tokens.
+    `summary_stats` carries the summarization settings and collects its counters.
+    """
+    stats = summary_stats or SummaryStats(SUMMARY_TRIGGER_TOKENS, SUMMARY_KEEP_MESSAGES)
+    trigger, keep = stats.trigger_tokens, stats.keep_messages
+
+    def customer_support_agent(state: SupportState, config) -> dict:
+        messages = build_prompt(state)
+        stats.record_prompt(estimate_tokens(messages))
+        response = chat_model.invoke(messages, config)
+        return {"messages": [AIMessage(content=response.content, id=response.id)]}
+
+    async def acustomer_support_agent(state: SupportState, config) -> dict:
+        messages = build_prompt(state)
+        stats.record_prompt(estimate_tokens(messages))
+        response = await chat_model.ainvoke(messages, config)
+        return {"messages": [AIMessage(content=response.content, id=response.id)]}
+
+    def route_turn(state: SupportState) -> str:
+        if trigger > 0 and estimate_tokens(build_prompt(state)) > trigger:
+            return "summarize_conversation"
+        return "customer_support"
+
+    def fold_request(state: SupportState):
+        older, recent = split_for_summary(state["messages"], keep)
+        request = [SystemMessage(content=SUMMARY_PROMPT),
+                   HumanMessage(content=summary_request(state.get("summary", ""), older))]
+        return older, recent, request
+
+    def fold_update(state: SupportState, older, recent, summary: str) -> dict:
+        before = estimate_tokens(build_prompt(state))
+        after = estimate_tokens(build_prompt({"messages": recent, "summary": summary}))
+        stats.record_summary(len(older), before, after)
+        return {"summary": summary, "messages": [RemoveMessage(id=message.id) for message in older]}
+
+    def summarize_conversation(state: SupportState, config) -> dict:
+        older, recent, request = fold_request(state)
+        if not older:
+            return {}
+        response = chat_model.invoke(request, config)
+        return fold_update(state, older, recent, response.content)
+
+    async def asummarize_conversation(state: SupportState, config) -> dict:
+        older, recent, request = fold_request(state)
+        if not older:
+            return {}
+        response = await chat_model.ainvoke(request, config)
+        return fold_update(state, older, recent, response.content)
 
-memory = MemorySaver()
-support_agent = builder.compile(checkpointer=memory)
+    builder = StateGraph(SupportState)
+    builder.add_node("customer_support", RunnableLambda(customer_support_agent, afunc=acustomer_support_agent))
+    builder.add_node("summarize_conversation", RunnableLambda(summarize_conversation, afunc=asummarize_conversation))
+    builder.add_conditional_edges(START, route_turn, ["summarize_conversation", "customer_support"])
+    builder.add_edge("summarize_conversation", "customer_support")
+    builder.add_edge("customer_support", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+llm = create_llm()
+memory = create_checkpointer()
+summary_stats = SummaryStats(SUMMARY_TRIGGER_TOKENS, SUMMARY_KEEP_MESSAGES)
+support_agent = build_support_agent(llm, memory, summary_stats)
 
 print("✅ Customer support agent built successfully!")
 
+
+def stream_support_reply(user_input: str, thread_id: str) -> str:
+    """Print the agent's reply token by token as it arrives; returns the full reply.
+
+    Only the new turn is rendered, so console output per turn stays the
+    same size however long the thread gets.
+    """
+    started = time.perf_counter()
+    first_token_at = None
+    reply = []
+
+    print("\n🤖 Support: ", end="", flush=True)
+    for chunk, metadata in support_agent.stream(
+        {"messages": [HumanMessage(content=user_input)]},
+        config={"configurable": {"thread_id": thread_id}},
+        stream_mode="messages"
+    ):
+        if metadata.get("langgraph_node") != "customer_support" or not isinstance(chunk, AIMessageChunk):
+            continue
+        if chunk.content and first_token_at is None:
+            first_token_at = time.perf_counter()
+        print(chunk.content, end="", flush=True)
+        reply.append(chunk.content)
+    print()
+
+    if os.getenv("SUPPORT_SHOW_TIMINGS", "0") == "1" and first_token_at is not None:
+        print(f"⏱️  first token {first_token_at - started:.2f}s, "
+              f"full reply {time.perf_counter() - started:.2f}s")
+    return "".join(reply)
+
+
 def run_customer_conversation(user_input: str, thread_id: str):
     result = support_agent.invoke(
         {"messages": [HumanMessage(content=user_input)]},
@@ -57,6 +190,7 @@ def real_time_conversation():
     print("="*70)
     print("Type 'exit' to end the conversation")
     print("Type 'new' to start a new conversation with a different thread")
+    print("Type 'stats' to see prompt size and summarization savings")
     print("="*70)
     
     thread_id = "user_001"  
@@ -80,6 +214,12 @@ def real_time_conversation():
             continue
         
         
+        if user_input.lower() == 'stats':
+            for key, value in summary_stats.snapshot().items():
+                print(f"   {key}: {value}")
+            continue
+        
+        
         if not user_input:
             print("Please enter a message.")
             continue
@@ -90,16 +230,7 @@ def real_time_conversation():
             print(f"Processing your query... (Thread: {thread_id})")
             print("="*70)
             
-            
-            result = support_agent.invoke(
-                {"messages": [HumanMessage(content=user_input)]},
-                config={"configurable": {"thread_id": thread_id}}
-            )
-            
-            
-            for message in result["messages"]:
-                if isinstance(message, AIMessage):
-                    print(f"\n🤖 Support: {message.content}")
+            stream_support_reply(user_input, thread_id)
             
             print("\n" + "="*70)
             
@@ -108,21 +239,32 @@ def real_time_conversation():
             print("Please try again or type 'exit' to quit.")
 
 
+TEST_CONVERSATIONS = {
+    "cust_001": [
+        "I bought a laptop last week",
+        "It won't turn on",
+        "What kind of laptop was it again?",
+    ],
+    "cust_002": [
+        "My phone battery drains quickly",
+        "It's an iPhone 14",
+    ],
+}
+
+
 def pre_defined_conversations():
     """Run the pre-defined test conversations."""
     print("\n" + "="*70)
     print("🧪 TEST CONVERSATION MODE - Customer Support Agent")
     print("="*70)
     
-    run_customer_conversation("I bought a laptop last week", thread_id="cust_001")
-    run_customer_conversation("It won't turn on", thread_id="cust_001")
-    run_customer_conversation("What kind of laptop was it again?", thread_id="cust_001")
-    
-    print("\n" + "="*70)
-    print("🔄 SEPARATE CONVERSATION - Different Customer")
-    print("="*70)
-    run_customer_conversation("My phone battery drains quickly", thread_id="cust_002")
-    run_customer_conversation("It's an iPhone 14", thread_id="cust_002")
+    for index, (thread_id, turns) in enumerate(TEST_CONVERSATIONS.items()):
+        if index:
+            print("\n" + "="*70)
+            print("🔄 SEPARATE CONVERSATION - Different Customer")
+            print("="*70)
+        for user_input in turns:
+            run_customer_conversation(user_input, thread_id=thread_id)
 
 if __name__ == "__main__":
     
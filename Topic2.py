@@ -1,10 +1,10 @@
 from langgraph.graph import START, END, StateGraph, MessagesState
 from langgraph.checkpoint.memory import MemorySaver
-from langgraph.prebuilt import ToolNode
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from parallel_tool_node import ParallelToolNode, parse_timeouts
 from typing import Literal
 import os
 
@@ -154,7 +154,14 @@ print("✅ Conditional routing function defined")
 builder = StateGraph(MessagesState)
 
 builder.add_node("assistant", assistant)
-builder.add_node("tools", ToolNode(tools))
+# All tool calls of a turn run at once; TOOL_TIMEOUTS overrides the default per tool, e.g. "web_search=8,get_weather=2"
+tool_node = ParallelToolNode(
+    tools,
+    max_workers=int(os.getenv("TOOL_MAX_WORKERS", "8")),
+    default_timeout=float(os.getenv("TOOL_TIMEOUT_SECONDS", "10")),
+    timeouts=parse_timeouts(os.getenv("TOOL_TIMEOUTS", "")),
+)
+builder.add_node("tools", tool_node)
 
 builder.add_edge(START, "assistant")
 builder.add_conditional_edges(
@@ -169,6 +176,34 @@ agent = builder.compile(checkpointer=memory)
 
 print("✅ Agent graph compiled with tools and memory")
 
+def print_tool_call(tool_call: dict):
+    print(f"🤖 Agent: [Calling {tool_call['name']} with: {tool_call['args']}]")
+
+def print_tool_result(message: ToolMessage, is_last_in_batch: bool):
+    content = message.content
+    if len(content) > 150:
+        content = content[:150] + "..."
+    timing = message.response_metadata or {}
+    icon = "🔧" if message.status != "error" else "⚠️ "
+    print(f"{icon} Tool Result ({message.name}, {timing.get('duration_ms', 0):.0f} ms): {content}")
+    if is_last_in_batch and timing.get("batch_size", 0) > 1:
+        print(f"⏱️  {timing['batch_size']} tools ran in parallel: {timing['batch_ms']:.0f} ms total")
+
+def print_agent_messages(messages: list):
+    """Show every tool call, every tool result with its duration, and the agent's replies"""
+    for index, message in enumerate(messages):
+        if isinstance(message, HumanMessage):
+            continue
+        elif isinstance(message, AIMessage):
+            if message.tool_calls:
+                for tool_call in message.tool_calls:
+                    print_tool_call(tool_call)
+            else:
+                print(f"🤖 Agent: {message.content}")
+        elif isinstance(message, ToolMessage):
+            is_last = index + 1 == len(messages) or not isinstance(messages[index + 1], ToolMessage)
+            print_tool_result(message, is_last)
+
 def run_agent_test(user_input: str, thread_id: str = "test_session"):
     """Run a single test query"""
     print(f"\n{'='*70}")
@@ -180,20 +215,7 @@ def run_agent_test(user_input: str, thread_id: str = "test_session"):
         config={"configurable": {"thread_id": thread_id}}
     )
     
-    for message in result["messages"]:
-        if isinstance(message, HumanMessage):
-            continue
-        elif isinstance(message, AIMessage):
-            if message.tool_calls:
-                tool_call = message.tool_calls[0]
-                print(f"🤖 Agent: [Calling {tool_call['name']} with: {tool_call['args']}]")
-            else:
-                print(f"🤖 Agent: {message.content}")
-        elif isinstance(message, ToolMessage):
-            content = message.content
-            if len(content) > 150:
-                content = content[:150] + "..."
-            print(f"🔧 Tool Result: {content}")
+    print_agent_messages(result["messages"])
     
     print(f"\n{'='*70}")
 
@@ -248,25 +270,10 @@ def real_time_conversation():
                 config={"configurable": {"thread_id": thread_id}}
             )
             
-            # Display only the last message (the final response)
-            last_message = result["messages"][-1]
-            
-            if isinstance(last_message, AIMessage):
-                if last_message.tool_calls:
-                    # If agent called a tool, show what happened
-                    for message in result["messages"]:
-                        if isinstance(message, AIMessage) and message.tool_calls:
-                            tool_call = message.tool_calls[0]
-                            print(f"🤖 Agent: [Calling {tool_call['name']} with: {tool_call['args']}]")
-                        elif isinstance(message, ToolMessage):
-                            content = message.content
-                            if len(content) > 150:
-                                content = content[:150] + "..."
-                            print(f"🔧 Tool Result: {content}")
-                        elif isinstance(message, AIMessage) and not message.tool_calls:
-                            print(f"🤖 Agent: {message.content}")
-                else:
-                    print(f"🤖 Agent: {last_message.content}")
+            # Display this turn only: every tool call, its result and the final response
+            messages = result["messages"]
+            turn_start = max(i for i, message in enumerate(messages) if isinstance(message, HumanMessage))
+            print_agent_messages(messages[turn_start + 1:])
             
             print("\n" + "="*70)
             
@@ -302,6 +309,10 @@ def run_predefined_tests():
     print("\nTEST 7: Tool priority test")
     run_agent_test("Define 'weather'", thread_id="priority_test")
     
+    print("\nTEST 8: Several tools in one turn (should run in parallel)")
+    run_agent_test("What's the weather in Lagos, London and Tokyo, and what does 'serendipity' mean?",
+                   thread_id="parallel_test")
+    
     print("\n" + "="*70)
     print("✅ All tests completed!")
     print("="*70)
@@ -0,0 +1,351 @@
+"""
+bounded_checkpointer.py - Durable, bounded LangGraph checkpointer on SQLite (WAL)
+
+Drop-in replacement for MemorySaver in the support agent:
+  - state survives restarts (one SQLite file, WAL mode)
+  - each thread keeps only its last `message_window` messages
+  - only the newest `keep_checkpoints` checkpoints per thread are kept
+  - threads idle for longer than `idle_ttl_seconds` are evicted
+Nothing is cached per thread in Python, so memory stays flat however
+many thread_ids are seen; resuming a thread is one indexed query.
+"""
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    last_active REAL NOT NULL,
+    turns INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS threads_by_last_active ON threads (last_active);
+"""
+
+
+class BoundedSqliteSaver(BaseCheckpointSaver):
+    """SQLite checkpointer with a message window, checkpoint compaction and idle eviction"""
+
+    def __init__(self, path: str = "support_checkpoints.sqlite", message_window: Optional[int] = 40,
+                 keep_checkpoints: int = 2, idle_ttl_seconds: Optional[float] = 30 * 24 * 3600,
+                 evict_every: int = 1000, serde=None):
+        super().__init__(serde=serde)
+        self.path = path
+        self.message_window = message_window
+        self.keep_checkpoints = max(1, keep_checkpoints)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.evict_every = evict_every
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")  # only takes effect on a new file
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints, fast commits
+        self.conn.executescript(SCHEMA)
+
+    # ---- helpers -------------------------------------------------------
+
+    @staticmethod
+    def _ids(config: RunnableConfig) -> Tuple[str, str, Optional[str]]:
+        configurable = config["configurable"]
+        return (
+            str(configurable["thread_id"]),
+            configurable.get("checkpoint_ns", ""),
+            configurable.get("checkpoint_id"),
+        )
+
+    def _trim_messages(self, checkpoint: Checkpoint) -> Checkpoint:
+        """Keep the last `message_window` messages, starting at a human turn"""
+        messages = checkpoint.get("channel_values", {}).get("messages")
+        if not self.message_window or not isinstance(messages, list) \
+                or len(messages) <= self.message_window:
+            return checkpoint
+        window = messages[-self.message_window:]
+        # Never start on an AI reply or a tool result whose call was cut off
+        for i, message in enumerate(window):
+            if getattr(message, "type", None) == "human":
+                window = window[i:]
+                break
+        channel_values = dict(checkpoint["channel_values"], messages=window)
+        return {**checkpoint, "channel_values": channel_values}
+
+    def _transaction(self):
+        """Serialize writers on the shared connection; BEGIN IMMEDIATE ... COMMIT"""
+        saver = self
+
+        class _Tx:
+            def __enter__(self):
+                saver._lock.acquire()
+                saver.conn.execute("BEGIN IMMEDIATE")
+                return saver.conn
+
+            def __exit__(self, exc_type, exc, tb):
+                try:
+                    saver.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+                finally:
+                    saver._lock.release()
+
+        return _Tx()
+
+    def _load_tuple(self, thread_id: str, checkpoint_ns: str, row: Sequence,
+                    writes: List[Tuple[str, str, Any]]) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, blob, metadata_type, metadata_blob = row
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                     "checkpoint_id": checkpoint_id}},
+            checkpoint=self.serde.loads_typed((type_, blob)),
+            metadata=self.serde.loads_typed((metadata_type, metadata_blob)),
+            parent_config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                            "checkpoint_id": parent_id}} if parent_id else None,
+            pending_writes=writes,
+        )
+
+    # ---- BaseCheckpointSaver -------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Latest (or the requested) checkpoint and its pending writes in one query"""
+        thread_id, checkpoint_ns, checkpoint_id = self._ids(config)
+        where = "thread_id = ? AND checkpoint_ns = ?" + (" AND checkpoint_id = ?" if checkpoint_id else "")
+        params = [thread_id, checkpoint_ns] + ([checkpoint_id] if checkpoint_id else [])
+        query = f"""
+            SELECT c.checkpoint_id, c.parent_checkpoint_id, c.type, c.checkpoint,
+                   c.metadata_type, c.metadata, w.task_id, w.channel, w.type, w.value
+            FROM (SELECT * FROM checkpoints WHERE {where}
+                  ORDER BY checkpoint_id DESC LIMIT 1) AS c
+            LEFT JOIN writes AS w
+              ON w.thread_id = c.thread_id AND w.checkpoint_ns = c.checkpoint_ns
+             AND w.checkpoint_id = c.checkpoint_id
+            ORDER BY w.task_id, w.idx
+        """
+        with self._lock, closing(self.conn.cursor()) as cursor:
+            rows = cursor.execute(query, params).fetchall()
+        if not rows:
+            return None
+        writes = [
+            (task_id, channel, self.serde.loads_typed((value_type, value)))
+            for *_, task_id, channel, value_type, value in rows if task_id is not None
+        ]
+        return self._load_tuple(thread_id, checkpoint_ns, rows[0][:6], writes)
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None,
+             limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config:
+            thread_id, checkpoint_ns, checkpoint_id = self._ids(config)
+            clauses += ["thread_id = ?", "checkpoint_ns = ?"]
+            params += [thread_id, checkpoint_ns]
+            if checkpoint_id:
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before:
+            clauses.append("checkpoint_id < ?")
+            params.append(before["configurable"]["checkpoint_id"])
+        query = ("SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, "
+                 "checkpoint, metadata_type, metadata FROM checkpoints")
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock, closing(self.conn.cursor()) as cursor:
+            rows = cursor.execute(query, params).fetchall()
+        yielded = 0
+        for thread_id, checkpoint_ns, *row in rows:
+            with self._lock, closing(self.conn.cursor()) as cursor:
+                writes = cursor.execute(
+                    "SELECT task_id, channel, type, value FROM writes WHERE thread_id = ? "
+                    "AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+                    (thread_id, checkpoint_ns, row[0])
+                ).fetchall()
+            item = self._load_tuple(thread_id, checkpoint_ns, row, [
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value in writes
+            ])
+            if filter and any(item.metadata.get(key) != value for key, value in filter.items()):
+                continue
+            yield item
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id, checkpoint_ns, parent_id = self._ids(config)
+        type_, blob = self.serde.dumps_typed(self._trim_messages(checkpoint))
+        metadata_type, metadata_blob = self.serde.dumps_typed(dict(metadata))
+        now = time.time()
+
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], parent_id, type_, blob,
+                 metadata_type, metadata_blob)
+            )
+            conn.execute(
+                "INSERT INTO threads (thread_id, last_active, turns) VALUES (?, ?, 1) "
+                "ON CONFLICT(thread_id) DO UPDATE SET last_active = excluded.last_active, "
+                "turns = turns + 1",
+                (thread_id, now)
+            )
+            # Compaction: older checkpoints (and their writes) are never resumed from
+            oldest_kept = conn.execute(
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+                (thread_id, checkpoint_ns, self.keep_checkpoints - 1)
+            ).fetchone()
+            if oldest_kept:
+                for table in ("checkpoints", "writes"):
+                    conn.execute(
+                        f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? "
+                        "AND checkpoint_id < ?",
+                        (thread_id, checkpoint_ns, oldest_kept[0])
+                    )
+            # Counted under the connection lock so concurrent puts can't skip or repeat an eviction
+            self._puts += 1
+            evict = bool(self.idle_ttl_seconds and self.evict_every
+                         and self._puts % self.evict_every == 0)
+
+        if evict:
+            self.evict_idle()
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                 "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]],
+                   task_id: str, task_path: str = "") -> None:
+        thread_id, checkpoint_ns, checkpoint_id = self._ids(config)
+        # Special channels (errors, interrupts) overwrite; regular writes are idempotent
+        verb = "INSERT OR REPLACE" if all(channel in WRITES_IDX_MAP for channel, _ in writes) \
+            else "INSERT OR IGNORE"
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, value_blob = self.serde.dumps_typed(value)
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id,
+                         WRITES_IDX_MAP.get(channel, idx), channel, value_type, value_blob))
+        with self._transaction() as conn:
+            conn.executemany(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._transaction() as conn:
+            for table in ("checkpoints", "writes", "threads"):
+                conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (str(thread_id),))
+
+    # ---- async (ainvoke / astream) -----------------------------------
+    # SQLite calls are short and serialized by the lock anyway, so the async
+    # API queues them on one dedicated worker thread: the event loop never
+    # blocks, and checkpoint IO doesn't compete for the default executor.
+
+    async def _run(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpointer")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await self._run(self.get_tuple, config)
+
+    async def alist(self, config: Optional[RunnableConfig], *,
+                    filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None,
+                    limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        items = await self._run(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint,
+                   metadata: CheckpointMetadata, new_versions: ChannelVersions) -> RunnableConfig:
+        return await self._run(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]],
+                          task_id: str, task_path: str = "") -> None:
+        await self._run(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self._run(self.delete_thread, thread_id)
+
+    # ---- maintenance ---------------------------------------------------
+
+    def evict_idle(self, max_idle_seconds: Optional[float] = None) -> int:
+        """Delete threads idle for longer than the TTL; returns how many were evicted"""
+        ttl = max_idle_seconds if max_idle_seconds is not None else self.idle_ttl_seconds
+        if not ttl:
+            return 0
+        cutoff = time.time() - ttl
+        with self._transaction() as conn:
+            idle = "SELECT thread_id FROM threads WHERE last_active < ?"
+            conn.execute(f"DELETE FROM checkpoints WHERE thread_id IN ({idle})", (cutoff,))
+            conn.execute(f"DELETE FROM writes WHERE thread_id IN ({idle})", (cutoff,))
+            evicted = conn.execute("DELETE FROM threads WHERE last_active < ?", (cutoff,)).rowcount
+        if evicted:
+            with self._lock:
+                # execute() steps the pragma once and frees a single page; executescript runs it to the end
+                self.conn.executescript("PRAGMA incremental_vacuum;")
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return evicted
+
+    def stats(self) -> dict:
+        with self._lock, closing(self.conn.cursor()) as cursor:
+            threads = cursor.execute("SELECT COUNT(*) FROM threads").fetchone()[0]
+            checkpoints = cursor.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+            writes = cursor.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+        size = sum(os.path.getsize(path) for path in (self.path, self.path + "-wal")
+                   if os.path.exists(path))
+        return {
+            "path": self.path,
+            "threads": threads,
+            "checkpoints": checkpoints,
+            "writes": writes,
+            "size_bytes": size,
+            "message_window": self.message_window,
+            "keep_checkpoints": self.keep_checkpoints,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,93 @@
+"""
+conversation_summary.py - Rolling-summary helpers for the Topic1 support agent
+
+Once a thread's prompt passes a token threshold, older turns are folded
+into a running summary and removed from state, so the prompt sent on
+each turn stays bounded however long the conversation runs.
+"""
+import threading
+from typing import List, Sequence, Tuple
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a customer support conversation for an "
+    "electronics store. Keep every fact the agent may need later: the customer's "
+    "products, order numbers, problems, steps already tried and promises made. "
+    "Be concise and write in the third person."
+)
+
+
+def estimate_tokens(messages: Sequence) -> int:
+    """Rough prompt size: ~4 characters per token plus a few tokens of framing per message"""
+    return sum(len(str(getattr(message, "content", message))) // 4 + 4 for message in messages)
+
+
+def split_for_summary(messages: List, keep_messages: int) -> Tuple[List, List]:
+    """(older messages to fold, recent messages to keep verbatim).
+
+    The kept tail always starts at a customer message, so the model never
+    sees a reply without the question it answers.
+    """
+    if len(messages) <= keep_messages:
+        return [], list(messages)
+    cut = len(messages) - keep_messages
+    while cut < len(messages) and getattr(messages[cut], "type", None) != "human":
+        cut += 1
+    if cut >= len(messages):
+        # No customer message in the tail: keep only the latest message
+        cut = len(messages) - 1
+    return list(messages[:cut]), list(messages[cut:])
+
+
+def summary_request(summary: str, older: Sequence) -> str:
+    transcript = "\n".join(
+        f"{'Customer' if getattr(message, 'type', None) == 'human' else 'Support'}: {message.content}"
+        for message in older
+    )
+    if summary:
+        return (f"Current summary:\n{summary}\n\nNew conversation turns:\n{transcript}\n\n"
+                "Rewrite the summary so it also covers the new turns.")
+    return f"Conversation so far:\n{transcript}\n\nSummarize it."
+
+
+class SummaryStats:
+    """Settings and counters for the summarization stage of one agent (all threads)"""
+
+    def __init__(self, trigger_tokens: int = 0, keep_messages: int = 6):
+        self.trigger_tokens = trigger_tokens  # 0 disables summarization
+        self.keep_messages = keep_messages
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.prompt_tokens_total = 0
+        self.prompt_tokens_max = 0
+        self.summaries = 0
+        self.messages_folded = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def record_prompt(self, tokens: int):
+        with self._lock:
+            self.turns += 1
+            self.prompt_tokens_total += tokens
+            self.prompt_tokens_max = max(self.prompt_tokens_max, tokens)
+
+    def record_summary(self, folded: int, tokens_before: int, tokens_after: int):
+        with self._lock:
+            self.summaries += 1
+            self.messages_folded += folded
+            self.tokens_before += tokens_before
+            self.tokens_after += tokens_after
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.trigger_tokens > 0,
+                "trigger_tokens": self.trigger_tokens,
+                "keep_messages": self.keep_messages,
+                "turns": self.turns,
+                "prompt_tokens_mean": round(self.prompt_tokens_total / self.turns, 1) if self.turns else 0.0,
+                "prompt_tokens_max": self.prompt_tokens_max,
+                "summaries": self.summaries,
+                "messages_folded": self.messages_folded,
+                # Estimated prompt tokens removed by each summarization, summed
+                "tokens_saved": self.tokens_before - self.tokens_after,
+            }
@@ -0,0 +1,85 @@
+"""
+fake_chat_model.py - Offline stand-in for ChatOpenAI in the Topic agents
+
+Answers deterministically from the prompt after a configurable delay,
+so graphs can be exercised and load-tested without OPENAI_API_KEY.
+Select it in Topic1.py with SUPPORT_LLM=fake.
+"""
+import time
+import random
+import asyncio
+import hashlib
+from typing import AsyncIterator, Iterator
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class FakeChatOpenAI(BaseChatModel):
+    """Deterministic chat model: waits `latency_seconds`, then answers.
+
+    Streaming emits one word per chunk, paced by `tokens_per_second`
+    (0 = as fast as possible). The async paths sleep with asyncio, so
+    many concurrent conversations don't tie up executor threads.
+    """
+
+    model_name: str = "fake-gpt-4o-mini"
+    latency_seconds: float = 0.3
+    tokens_per_second: float = 0.0
+    answer_words: int = 30
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-openai"
+
+    def _answer(self, messages) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        words = [word for word in prompt.split() if word.isalpha()]
+        rng = random.Random(digest)
+        picked = [rng.choice(words) for _ in range(self.answer_words)] if words else []
+        return "Thanks for reaching out! " + " ".join(picked)
+
+    def _usage(self, messages, answer: str) -> dict:
+        # Rough 4-characters-per-token estimate, shaped like OpenAI's usage block
+        prompt_tokens = sum(len(str(message.content)) for message in messages) // 4
+        completion_tokens = len(answer) // 4
+        return {"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_seconds)
+        answer = self._answer(messages)
+        message = AIMessage(content=answer, usage_metadata=self._usage(messages, answer))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency_seconds)
+        answer = self._answer(messages)
+        message = AIMessage(content=answer, usage_metadata=self._usage(messages, answer))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None,
+                **kwargs) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency_seconds)  # time to first token
+        delay = 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+        for word in self._answer(messages).split(" "):
+            if delay:
+                time.sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None,
+                       **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency_seconds)
+        delay = 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+        for word in self._answer(messages).split(" "):
+            if delay:
+                await asyncio.sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
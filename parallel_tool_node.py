@@ -0,0 +1,118 @@
+"""
+parallel_tool_node.py - Run every tool call of a turn concurrently, with per-tool timeouts
+
+Replacement for ToolNode in the Topic2 agent. All tool_calls of the last
+AIMessage start at once on a shared thread pool, so a multi-tool turn
+takes about as long as its slowest tool. Each call gets its own deadline;
+a call that misses it (or raises) becomes an error ToolMessage, so the
+model can still answer with the tools that did finish. Every ToolMessage
+carries its timing in response_metadata.
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Optional, Sequence
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+
+def parse_timeouts(spec: str) -> Dict[str, float]:
+    """'web_search=8,get_weather=2' -> {'web_search': 8.0, 'get_weather': 2.0}"""
+    timeouts = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, seconds = item.partition("=")
+        timeouts[name.strip()] = float(seconds)
+    return timeouts
+
+
+class ParallelToolNode:
+    """Graph node that executes all pending tool calls concurrently.
+
+    A timed-out call can't be killed; its worker thread finishes in the
+    background and its result is dropped, so size `max_workers` for a few
+    stragglers on top of the usual number of calls per turn.
+    """
+
+    def __init__(self, tools: Sequence, max_workers: int = 8, default_timeout: float = 10.0,
+                 timeouts: Optional[Dict[str, float]] = None):
+        self.tools = {tool.name: tool for tool in tools}
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self.timeouts = dict(timeouts or {})
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.calls = 0
+        self.timed_out = 0
+        self.failed = 0
+
+    def _run_tool(self, call: dict, config) -> tuple:
+        """(content, status, seconds); tool errors are returned, not raised"""
+        start = time.perf_counter()
+        try:
+            content, status = str(self.tools[call["name"]].invoke(call["args"], config)), "success"
+        except Exception as e:
+            content, status = f"Error: {call['name']} failed: {e}", "error"
+        return content, status, time.perf_counter() - start
+
+    def __call__(self, state, config) -> dict:
+        message = state["messages"][-1]
+        tool_calls = message.tool_calls if isinstance(message, AIMessage) else []
+        started = time.perf_counter()
+
+        futures = []
+        for call in tool_calls:
+            if call["name"] in self.tools:
+                futures.append(self._executor.submit(self._run_tool, call, config))
+            else:
+                futures.append(None)
+
+        results, timed_out, failed = [], 0, 0
+        for call, future in zip(tool_calls, futures):
+            timeout = self.timeouts.get(call["name"], self.default_timeout)
+            if future is None:
+                content, status, elapsed = f"Error: unknown tool '{call['name']}'", "error", 0.0
+                failed += 1
+            else:
+                # Every call started at `started`, so each deadline is measured from there
+                remaining = max(0.0, started + timeout - time.perf_counter())
+                try:
+                    content, status, elapsed = future.result(timeout=remaining)
+                    failed += status == "error"
+                except FutureTimeoutError:
+                    future.cancel()
+                    content = f"Error: {call['name']} timed out after {timeout:g}s"
+                    status, elapsed = "error", timeout
+                    timed_out += 1
+            results.append((call, content, status, elapsed))
+
+        batch_ms = round((time.perf_counter() - started) * 1000, 1)
+        with self._lock:
+            self.batches += 1
+            self.calls += len(tool_calls)
+            self.timed_out += timed_out
+            self.failed += failed
+
+        return {"messages": [
+            ToolMessage(
+                content=content,
+                name=call["name"],
+                tool_call_id=call["id"],
+                status=status,
+                response_metadata={"duration_ms": round(elapsed * 1000, 1), "batch_ms": batch_ms,
+                                   "batch_size": len(tool_calls)},
+            )
+            for call, content, status, elapsed in results
+        ]}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "default_timeout_seconds": self.default_timeout,
+                "timeouts": dict(self.timeouts),
+                "batches": self.batches,
+                "calls": self.calls,
+                "timed_out": self.timed_out,
+                "failed": self.failed,
+            }
@@ -0,0 +1,240 @@
+"""
+support_load_driver.py - Concurrent multi-session load test for the Topic1 support agent
+
+Replays scripted customer conversations across many thread IDs at once
+with `ainvoke`, keeping at most --concurrency turns in flight. Turns
+within one conversation stay in order, as they would for a real
+customer. Reports throughput, per-turn latency percentiles and the time
+spent inside the checkpointer, for each checkpointer backend.
+
+Runs offline by default with FakeChatOpenAI (no OPENAI_API_KEY needed):
+
+    python support_load_driver.py --threads 200 --concurrency 32
+    python support_load_driver.py --checkpointers sqlite --fake-latency-ms 50 --output load.json
+    python support_load_driver.py --llm openai --threads 10 --concurrency 5
+"""
+import os
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+from collections import defaultdict
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+EXTRA_CONVERSATIONS = [
+    [
+        "Hi, my order hasn't arrived yet",
+        "The order number is 48213",
+        "Can you tell me when it will be delivered?",
+        "Thanks, can I change the delivery address?",
+    ],
+    [
+        "My wireless headphones keep disconnecting",
+        "They're connected to a Windows laptop",
+        "I already tried re-pairing them",
+    ],
+    [
+        "Do you price match other stores?",
+        "I saw the same TV 50 dollars cheaper online",
+    ],
+]
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, round(pct / 100.0 * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+
+def summarize_ms(samples):
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) * 1000 / len(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+class TimedCheckpointer(BaseCheckpointSaver):
+    """Wraps a checkpointer and records how long each call takes"""
+
+    def __init__(self, inner: BaseCheckpointSaver):
+        super().__init__(serde=inner.serde)
+        self.inner = inner
+        self.samples = defaultdict(list)
+
+    def _timed(self, op, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.samples[op].append(time.perf_counter() - start)
+
+    async def _atimed(self, op, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            self.samples[op].append(time.perf_counter() - start)
+
+    def get_next_version(self, current, channel):
+        return self.inner.get_next_version(current, channel)
+
+    def get_tuple(self, config):
+        return self._timed("get_tuple", self.inner.get_tuple, config)
+
+    def list(self, config, **kwargs):
+        return self._timed("list", lambda: list(self.inner.list(config, **kwargs)))
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        return self._timed("put", self.inner.put, config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, *args, **kwargs):
+        return self._timed("put_writes", self.inner.put_writes, config, writes, task_id, *args, **kwargs)
+
+    async def aget_tuple(self, config):
+        return await self._atimed("get_tuple", self.inner.aget_tuple, config)
+
+    async def alist(self, config, **kwargs):
+        start = time.perf_counter()
+        items = [item async for item in self.inner.alist(config, **kwargs)]
+        self.samples["list"].append(time.perf_counter() - start)
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await self._atimed("put", self.inner.aput, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, *args, **kwargs):
+        return await self._atimed("put_writes", self.inner.aput_writes, config, writes, task_id,
+                                  *args, **kwargs)
+
+    def report(self, turns):
+        # Awaited time per call, so under load it includes queueing behind other sessions
+        total = sum(sum(samples) for samples in self.samples.values())
+        return {
+            "per_turn_ms": round(total * 1000 / turns, 3) if turns else 0.0,
+            "total_seconds": round(total, 3),
+            "calls": {op: summarize_ms(samples) for op, samples in sorted(self.samples.items())},
+        }
+
+
+def make_checkpointer(kind, workdir, message_window):
+    from langgraph.checkpoint.memory import MemorySaver
+    from bounded_checkpointer import BoundedSqliteSaver
+
+    if kind == "memory":
+        return MemorySaver()
+    return BoundedSqliteSaver(path=os.path.join(workdir, "load.sqlite"), message_window=message_window)
+
+
+async def run_load(agent, scripts, threads, concurrency, thread_prefix):
+    """Replay scripts across `threads` conversations; returns (wall seconds, turn latencies, errors)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def conversation(index):
+        thread_id = f"{thread_prefix}_{index:06d}"
+        config = {"configurable": {"thread_id": thread_id}}
+        for user_input in scripts[index % len(scripts)]:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await agent.ainvoke({"messages": [("user", user_input)]}, config=config)
+                except Exception as e:
+                    errors.append(f"{thread_id}: {e}")
+                    return
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(conversation(i) for i in range(threads)))
+    return time.perf_counter() - start, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for the Topic1 support agent")
+    parser.add_argument("--threads", type=int, default=100, help="Number of concurrent conversations")
+    parser.add_argument("--concurrency", type=int, default=20, help="Max turns in flight at once")
+    parser.add_argument("--llm", choices=["fake", "openai"], default="fake")
+    parser.add_argument("--fake-latency-ms", type=float, default=300.0)
+    parser.add_argument("--checkpointers", nargs="+", choices=["memory", "sqlite"],
+                        default=["memory", "sqlite"])
+    parser.add_argument("--message-window", type=int, default=40)
+    parser.add_argument("--summary-trigger-tokens", type=int, default=0,
+                        help="Fold older turns into a summary past this prompt size (0 = off)")
+    parser.add_argument("--summary-keep-messages", type=int, default=6)
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    # Topic1 builds its own module-level agent on import; keep it offline and in memory
+    if args.llm == "fake":
+        os.environ["SUPPORT_LLM"] = "fake"
+    os.environ["SUPPORT_CHECKPOINTER"] = "memory"
+    import Topic1
+    from conversation_summary import SummaryStats
+
+    if args.llm == "fake":
+        from fake_chat_model import FakeChatOpenAI
+
+        chat_model = FakeChatOpenAI(latency_seconds=args.fake_latency_ms / 1000)
+    else:
+        chat_model = Topic1.create_llm()
+
+    scripts = list(Topic1.TEST_CONVERSATIONS.values()) + EXTRA_CONVERSATIONS
+    results = {
+        "llm": args.llm,
+        "fake_latency_ms": args.fake_latency_ms if args.llm == "fake" else None,
+        "threads": args.threads,
+        "concurrency": args.concurrency,
+        "backends": {},
+    }
+    workdir = tempfile.mkdtemp(prefix="support_load_")
+    try:
+        for kind in args.checkpointers:
+            checkpointer = TimedCheckpointer(make_checkpointer(kind, workdir, args.message_window))
+            summary_stats = SummaryStats(args.summary_trigger_tokens, args.summary_keep_messages)
+            agent = Topic1.build_support_agent(chat_model, checkpointer, summary_stats)
+            print(f"🚀 {kind}: {args.threads} conversations, {args.concurrency} turns in flight")
+            wall, latencies, errors = asyncio.run(
+                run_load(agent, scripts, args.threads, args.concurrency, f"load_{kind}")
+            )
+            results["backends"][kind] = {
+                "turns": len(latencies),
+                "errors": len(errors),
+                "first_errors": errors[:5],
+                "wall_seconds": round(wall, 3),
+                "turns_per_second": round(len(latencies) / wall, 2) if wall else 0.0,
+                "turn_latency": summarize_ms(latencies),
+                "checkpointer": checkpointer.report(len(latencies)),
+                "summarization": summary_stats.snapshot(),
+            }
+            if hasattr(checkpointer.inner, "stats"):
+                results["backends"][kind]["checkpointer"]["store"] = checkpointer.inner.stats()
+                checkpointer.inner.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    backends = results["backends"]
+    if "memory" in backends and "sqlite" in backends:
+        results["sqlite_overhead_per_turn_ms"] = round(
+            backends["sqlite"]["checkpointer"]["per_turn_ms"]
+            - backends["memory"]["checkpointer"]["per_turn_ms"], 3
+        )
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()